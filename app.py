@@ -1,137 +1,341 @@
+# Timed from here so the import phase shows up in the startup report
+from utils.startup import StartupTimer
+startup = StartupTimer()
+
 import discord
 from discord.ext import commands, tasks
 import os
+import sys
 import json
 import asyncio
 import aiohttp
-from flask import Flask
 from datetime import datetime
 import traceback
+import time
+import argparse
+from utils.database import db
+from utils.helpers import Helpers
+from utils.stats_buffer import StatsBuffer
+from utils.cooldowns import CooldownManager
+from utils.guild_settings import GuildSettingsService
+from utils.message_pipeline import MessagePipeline, CHAT, IMAGE, TOO_LONG, COMMANDS
+from utils.work_queue import FairWorkQueue
+from utils.batcher import MessageBatcher
+from utils.metrics import metrics
+from utils.health_server import HealthServer
+from utils.command_sync import CommandSyncer
+from utils.shared_state import create_backend
+from utils.automod import AutoModerator
+
+startup.mark('imports')
 
 # Load config
 with open('config.json', 'r') as f:
     config = json.load(f)
 
-# Flask app
-app = Flask(__name__)
+def run_flask(host, port):
+    """Threaded Flask server, only used when settings.health.server is 'flask'"""
+    from flask import Flask, Response
+    app = Flask(__name__)
+
+    @app.route('/')
+    def home():
+        return "🤖 DigamberGPT - Operational"
 
-@app.route('/')
-def home():
-    return "🤖 DigamberGPT - Operational"
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
-def run_flask():
-    port = int(os.environ.get("PORT", 10000))
-    app.run(host='0.0.0.0', port=port)
+    app.run(host=host, port=port)
 
 TOKEN = os.getenv("DISCORD_TOKEN")
 
-class ChatGPTBot(commands.Bot):
-    def __init__(self):
-        intents = discord.Intents.all()
+# Independent of each other, loaded concurrently in setup_hook
+EXTENSIONS = ['cogs.ai_commands', 'cogs.mod_commands', 'cogs.fun_commands', 'cogs.image_commands']
+
+def gateway_options(gateway_settings):
+    """Intents and cache options for the configured gateway profile.
+
+    "lean" asks only for what the bot reads: the guild list, guild and DM
+    messages and their content. Members are never cached or chunked, and
+    the message cache is bounded. "full" is the old everything-on setup.
+    """
+    if gateway_settings.get('profile', 'lean') == 'full':
+        return {'intents': discord.Intents.all()}
+    
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.guild_messages = True
+    intents.dm_messages = True
+    intents.message_content = True
+    return {
+        'intents': intents,
+        'member_cache_flags': discord.MemberCacheFlags.none(),
+        'max_messages': gateway_settings.get('max_messages', 200),
+        'chunk_guilds_at_startup': gateway_settings.get('chunk_guilds_at_startup', False)
+    }
+
+class ChatGPTBot(commands.AutoShardedBot):
+    def __init__(self, force_sync=False, shard_ids=None, shard_count=None, cluster=None):
+        sharding = config['settings'].get('sharding', {})
         super().__init__(
             command_prefix="!",
-            intents=intents,
             help_command=None,
-            case_insensitive=True
+            case_insensitive=True,
+            shard_ids=shard_ids,
+            shard_count=shard_count or sharding.get('shard_count'),
+            **gateway_options(config['settings'].get('gateway', {}))
         )
         self.config = config
         self.start_time = datetime.now()
+        self.force_sync = force_sync
+        # In a multi-process launch only the first cluster touches the command tree
+        self.cluster = cluster
+        self.sync_commands = cluster in (None, 0)
+        self.shared_state = create_backend(config['settings'].get('shared_state', {}), clustered=cluster is not None)
+        self.sync_task = None
         self.session = None
-        self.ai_channels = {}  # Store AI channels per server
+        self.db = db
+        stats_settings = config['settings'].get('stats', {})
+        self.stats = StatsBuffer(
+            self.db,
+            flush_interval=stats_settings.get('flush_interval', 30),
+            max_pending=stats_settings.get('max_pending', 500)
+        )
+        self.guild_settings = GuildSettingsService(self.db)
+        automod_settings = config['settings'].get('automod', {})
+        self.automod = AutoModerator(self.guild_settings, config['settings']) if automod_settings.get('enabled', True) else None
+        
+        # Per-user/channel/guild limits on auto-responses
+        limits = dict(config['settings'].get('cooldowns', {}))
+        limits.setdefault('user', {'rate': 1, 'per': config['settings'].get('default_cooldown', 3)})
+        self.cooldowns = CooldownManager(limits, backend=self.shared_state)
+        self.pipeline = MessagePipeline(
+            self,
+            prefix=config['settings'].get('prefix', '!'),
+            max_prompt_chars=config['settings'].get('max_prompt_chars', 4000)
+        )
+        
+        # AI work runs on a fixed worker pool, not inside on_message
+        queue_settings = config['settings'].get('queue', {})
+        self.busy_reply = queue_settings.get('busy_reply', True)
+        self.drain_timeout = queue_settings.get('drain_timeout', 10)
+        # Strong references, the loop only keeps weak ones to running tasks
+        self.busy_replies = set()
+        self.ai_queue = FairWorkQueue(
+            self.run_ai_job,
+            workers=queue_settings.get('workers', 8),
+            max_depth=queue_settings.get('max_depth', 200),
+            per_guild_depth=queue_settings.get('per_guild_depth', 25),
+            shed_policy=queue_settings.get('shed_policy', 'drop_oldest'),
+            on_shed=self.on_job_shed
+        )
+        
+        # Merge rapid-fire messages into one prompt
+        batch_settings = config['settings'].get('batching', {})
+        self.batcher = MessageBatcher(
+            self.dispatch_batch,
+            window=batch_settings.get('window', 1.5),
+            max_messages=batch_settings.get('max_messages', 5),
+            max_wait=batch_settings.get('max_wait', 6.0),
+            max_chars=self.pipeline.max_prompt_chars
+        ) if batch_settings.get('enabled', False) else None
+        
+        # Health endpoints run on the bot's own loop unless Flask is asked for
+        health_settings = config['settings'].get('health', {})
+        self.health_server_kind = health_settings.get('server', 'aiohttp') if health_settings.get('enabled', True) else None
+        self.health_host = health_settings.get('host', '0.0.0.0')
+        self.health_port = int(os.environ.get("PORT", health_settings.get('port', 10000))) + (cluster or 0)
+        self.health = HealthServer(
+            self,
+            host=self.health_host,
+            port=self.health_port,
+            max_failure_streak=health_settings.get('max_failure_streak', 5)
+        ) if self.health_server_kind == 'aiohttp' else None
+        
+        metrics.gauge('bot_guilds', lambda: len(self.guilds), "Servers the bot is in")
+        metrics.gauge('bot_gateway_latency_seconds', lambda: self.latency, "Gateway heartbeat latency")
+        metrics.gauge('bot_queue_depth', lambda: self.ai_queue.depth, "AI jobs waiting for a worker")
+        metrics.gauge('bot_rss_bytes', Helpers.rss_bytes, "Resident memory of the bot process")
+        metrics.gauge('bot_uptime_seconds', lambda: (datetime.now() - self.start_time).total_seconds(), "Seconds since start")
+        metrics.gauge('bot_startup_seconds', lambda: startup.total or 0, "Seconds from process start to the first on_ready")
+        startup.mark('bot init')
 
     async def setup_hook(self):
+        # Everything since bot init was login to Discord
+        startup.mark('login')
+        
         # Start session
         self.session = aiohttp.ClientSession()
         
-        # Load cogs
-        cogs = ['cogs.ai_commands', 'cogs.mod_commands']
+        # setup_hook runs once, unlike on_ready which fires on every reconnect.
+        # The health server, guild settings and extensions don't depend on
+        # each other, so they load together; no message arrives before the
+        # gateway connects, which is only after setup_hook returns
+        results = await asyncio.gather(
+            startup.track('health server', self.start_health_server()),
+            startup.track('guild settings', self.guild_settings.load()),
+            *(startup.track(extension, self.load_extension(extension)) for extension in EXTENSIONS),
+            return_exceptions=True
+        )
+        for extension, result in zip(EXTENSIONS, results[2:]):
+            if isinstance(result, BaseException):
+                print(f"❌ Failed to load {extension}: {result}")
+                traceback.print_exception(type(result), result, result.__traceback__)
+            else:
+                print(f"✅ Loaded: {extension}")
+        if isinstance(results[1], BaseException):
+            raise results[1]
+        startup.mark('setup')
         
-        for cog in cogs:
-            try:
-                await self.load_extension(cog)
-                print(f"✅ Loaded: {cog}")
-            except Exception as e:
-                print(f"❌ Failed to load {cog}: {e}")
-                traceback.print_exc()
+        # Sync only when the command tree changed since the last sync, in
+        # the background so it doesn't hold up the gateway connection
+        if self.sync_commands:
+            self.sync_task = asyncio.create_task(self.sync_command_tree())
         
-        # Sync commands with better handling
+        # Start tasks
+        self.update_presence.start()
+        self.prune_shared_state.start()
+        self.stats.start()
+        self.ai_queue.start()
+        startup.mark('background tasks')
+
+    async def sync_command_tree(self):
         try:
-            print("🔄 Syncing slash commands...")
-            synced = await self.tree.sync()
-            print(f"✅ Successfully synced {len(synced)} slash commands")
-            
-            # Print all commands
-            for cmd in synced:
-                print(f"   - /{cmd.name}")
+            started = time.perf_counter()
+            synced = await CommandSyncer(self.tree, self.db).sync(self.application_id, force=self.force_sync)
+            if synced is None:
+                print("✅ Slash commands unchanged, skipping sync")
+            else:
+                print(f"✅ Successfully synced {len(synced)} slash commands in {time.perf_counter() - started:.2f}s")
+                
+                # Print all commands
+                for cmd in synced:
+                    print(f"   - /{cmd.name}")
                 
         except Exception as e:
             print(f"❌ Slash command sync failed: {e}")
             traceback.print_exc()
-        
-        # Start tasks
-        self.update_presence.start()
 
     async def on_ready(self):
+        # Report once; on_ready fires again after reconnects
+        if startup.finish():
+            print(startup.report())
+            print(f"💾 RSS {Helpers.rss_bytes() / 1048576:.1f} MB")
         print(f"\n🚀 {self.user} is ONLINE!")
+        cluster = f" (cluster {self.cluster})" if self.cluster is not None else ""
+        print(f"🧩 Shards: {sorted(self.shards)} of {self.shard_count}{cluster}")
         print(f"📊 Servers: {len(self.guilds)}")
-        print(f"👥 Users: {sum(g.member_count for g in self.guilds)}")
+        # member_count comes with GUILD_CREATE, no member cache needed
+        print(f"👥 Users: {sum(g.member_count or 0 for g in self.guilds)}")
         
         # Print available commands
         commands_list = [cmd.name for cmd in self.tree.get_commands()]
         print(f"🎯 Available commands: {', '.join(commands_list)}")
-        
-        # Start Flask in background for Render
-        if os.environ.get('RENDER'):
-            import threading
-            threading.Thread(target=run_flask, daemon=True).start()
-            print("🌐 Flask server started")
-
-    async def on_guild_join(self, guild):
-        """Auto-sync commands when bot joins new server"""
+
+    async def start_health_server(self):
         try:
-            await self.tree.sync(guild=guild)
-            print(f"✅ Commands synced for new server: {guild.name}")
+            if self.health:
+                await self.health.start()
+            elif self.health_server_kind == 'flask':
+                import threading
+                threading.Thread(target=run_flask, args=(self.health_host, self.health_port), daemon=True).start()
+                print("🌐 Flask server started")
         except Exception as e:
-            print(f"❌ Failed to sync commands for {guild.name}: {e}")
+            print(f"❌ Health server failed to start: {e}")
 
-    async def on_message(self, message):
-        if message.author.bot:
-            return
+    def gateway_healthy(self):
+        """Ready, not closing, and every shard has an open connection"""
+        return self.is_ready() and not self.is_closed() and all(not shard.is_closed() for shard in self.shards.values())
 
-        # Check if message is in AI channel
-        guild_id = str(message.guild.id)
-        
-        if guild_id in self.ai_channels:
-            ai_channel_id = self.ai_channels[guild_id]
-            
-            # If message is in AI channel, process automatically
-            if str(message.channel.id) == ai_channel_id:
-                # Ignore commands
-                if not message.content.startswith('!'):
-                    await self.process_ai_message(message)
-                    return
+    def dispatch(self, event_name, /, *args, **kwargs):
+        # Counted inline: an on_socket_event_type listener would cost a task per gateway event
+        if event_name == 'socket_event_type':
+            metrics.inc('bot_gateway_events_total', event=args[0])
+        super().dispatch(event_name, *args, **kwargs)
+
+    async def on_error(self, event_method, *args, **kwargs):
+        error = sys.exc_info()[1]
+        metrics.inc('bot_errors_total', where=event_method, type=type(error).__name__)
+        await super().on_error(event_method, *args, **kwargs)
+
+    async def on_command_error(self, ctx, error):
+        metrics.inc('bot_errors_total', where='command', type=type(getattr(error, 'original', error)).__name__)
+        await super().on_command_error(ctx, error)
+
+    async def on_message(self, message):
+        # Cheap checks first, only survivors reach the model
+        action = await self.pipeline.classify(message)
         
-        # Process commands for other channels
-        await self.process_commands(message)
+        if action == CHAT and self.batcher:
+            self.batcher.add(message)
+        elif action in (CHAT, IMAGE):
+            self.ai_queue.submit(message.guild.id, (action, message, message.content))
+        elif action == TOO_LONG:
+            await message.reply(f"⚠️ That message is too long for me, please keep it under {self.pipeline.max_prompt_chars} characters.")
+        elif action == COMMANDS:
+            # Process commands for other channels
+            await self.process_commands(message)
+
+    def dispatch_batch(self, messages):
+        """Queue a debounced batch as one AI request, answering the last message"""
+        message = messages[-1]
+        self.ai_queue.submit(message.guild.id, (CHAT, message, self.batcher.merge(messages)))
 
-    async def process_ai_message(self, message):
+    async def run_ai_job(self, job):
+        """Worker entry point for queued AI messages"""
+        action, message, content = job
+        if action == IMAGE:
+            await self.process_image_request(message)
+        else:
+            await self.process_ai_message(message, content)
+
+    def on_job_shed(self, job):
+        """Tell the user their message was dropped under load"""
+        if self.busy_reply:
+            _, message, _ = job
+            task = asyncio.create_task(self._reply_busy(message))
+            self.busy_replies.add(task)
+            task.add_done_callback(self.busy_replies.discard)
+
+    async def _reply_busy(self, message):
+        try:
+            await message.reply("⏳ I'm handling a lot of messages right now, please try again in a moment.")
+        except discord.HTTPException:
+            pass
+
+    async def process_image_request(self, message):
+        """Hand image requests to the image cog's own bounded queue"""
+        image_cog = self.get_cog('ImageCommands')
+        try:
+            if image_cog:
+                self.stats.record_request(str(message.author.id))
+                image_cog.submit(message.reply, message.channel.id, message.content)
+            else:
+                await message.reply("🖼️ Image generation feature coming soon! Currently I can only chat.")
+        except Exception as e:
+            print(f"Image request error: {e}")
+
+    async def process_ai_message(self, message, content=None):
         """Process AI messages automatically"""
+        content = content or message.content
         try:
             # Get AI cog
             ai_cog = self.get_cog('AICommands')
             if ai_cog:
+                ai_cog.update_stats(message.author.id)
+                key = ai_cog.conversation_key(message.author.id, message.channel.id)
+                
                 async with message.channel.typing():
-                    response = await ai_cog.get_ai_response(message.content)
-                    
-                    # Check if user wants image generation
-                    if any(word in message.content.lower() for word in ['image', 'picture', 'photo', 'generate image', 'draw', 'create image']):
-                        # Send image generation message
-                        await message.reply("🖼️ Image generation feature coming soon! Currently I can only chat.")
+                    if ai_cog.streaming:
+                        # Post the first tokens right away and edit as the rest arrive
+                        await ai_cog.send_streamed(message.reply, message.channel.id, content, conversation_key=key)
                     else:
-                        # Send AI response
-                        await message.reply(response)
+                        response = await ai_cog.get_ai_response(content, key)
+                        await Helpers.send_long(message.reply, message.channel.send, response)
                         
         except Exception as e:
+            metrics.inc('bot_errors_total', where='auto_response', type=type(e).__name__)
             print(f"AI processing error: {e}")
 
     @tasks.loop(minutes=10)
@@ -144,12 +348,42 @@ class ChatGPTBot(commands.Bot):
         activity = activities[(datetime.now().minute // 10) % len(activities)]
         await self.change_presence(activity=activity)
 
+    @tasks.loop(minutes=10)
+    async def prune_shared_state(self):
+        await self.shared_state.prune()
+
     async def close(self):
+        if self.sync_task and not self.sync_task.done():
+            self.sync_task.cancel()
+        # Open batches become queued jobs; let the workers answer them while
+        # the HTTP session is still up, then stop whatever is left
+        if self.batcher:
+            self.batcher.flush_all()
+        if not await self.ai_queue.drain(self.drain_timeout):
+            print(f"⚠️ Dropped {self.ai_queue.depth} queued AI jobs on shutdown")
+        await self.ai_queue.stop()
         if self.session:
             await self.session.close()
+        await self.stats.stop()
+        await self.db.close()
+        await self.shared_state.close()
+        if self.health:
+            await self.health.stop()
         await super().close()
 
 # Run bot
 if __name__ == "__main__":
-    bot = ChatGPTBot()
+    parser = argparse.ArgumentParser(description="DigamberGPT Discord bot")
+    parser.add_argument('--force-sync', action='store_true', help="sync slash commands even if the tree is unchanged")
+    parser.add_argument('--shard-ids', help="comma-separated shards to run in this process (set by launcher.py)")
+    parser.add_argument('--shard-count', type=int, help="total shards across all processes")
+    parser.add_argument('--cluster', type=int, help="index of this process in a multi-process launch")
+    args = parser.parse_args()
+    
+    bot = ChatGPTBot(
+        force_sync=args.force_sync,
+        shard_ids=[int(i) for i in args.shard_ids.split(',')] if args.shard_ids else None,
+        shard_count=args.shard_count,
+        cluster=args.cluster
+    )
     bot.run(TOKEN)
@@ -0,0 +1,87 @@
+"""Auto-moderation throughput: AutoModerator.check over synthetic traffic.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_automod --messages 200000 --guilds 500
+
+Messages are spread over fake guilds and channels; a share carry links
+(some to denied or allowed domains) and a share start a burst of identical
+messages from one author to trigger flood detection. Reports checks per second, how many
+messages each rule caught and how many bulk-delete calls removed them.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.fake_discord import FakeMessage, FakeUser, build_topology
+from utils.automod import AutoModerator
+from utils.guild_settings import GuildSettingsService
+
+WORDS = ["hello", "anyone", "here", "what", "is", "the", "best", "way", "to", "learn", "python", "today"]
+HOSTS = ["example.com", "cdn.discordapp.com", "youtube.com", "free-nitro.gift", "docs.python.org"]
+
+def build_messages(args, channels, rng: random.Random):
+    users = [FakeUser(10**6 + i) for i in range(args.users)]
+    messages = []
+    while len(messages) < args.messages:
+        user = rng.choice(users)
+        channel = rng.choice(channels)
+        roll = rng.random()
+        repeats = 1
+        if roll < args.flood:
+            # A burst of the same text, past the flood threshold
+            repeats = 8
+            content = " ".join(rng.choices(WORDS, k=4))
+        elif roll < args.flood + args.links:
+            content = f"check this https://{rng.choice(HOSTS)}/page/{len(messages)}"
+        else:
+            content = " ".join(rng.choices(WORDS, k=rng.randint(3, 12)))
+        for _ in range(repeats):
+            messages.append(FakeMessage(len(messages) + 1, user, channel, content))
+    return messages
+
+async def run(args):
+    rng = random.Random(args.seed)
+    channels = build_topology(args.guilds, args.channels)
+    guild_settings = GuildSettingsService(None)
+    settings = {
+        'delete_links': True,
+        'automod': {
+            'allowed_domains': ['discordapp.com', 'python.org'],
+            'denied_domains': ['free-nitro.gift'] + [f"blocked{i}.example" for i in range(args.denied)],
+            'flood': {'threshold': 4, 'window': 10},
+            'delete_delay': 0.05,
+            'notify': False
+        }
+    }
+    automod = AutoModerator(guild_settings, settings)
+    messages = build_messages(args, channels, rng)
+
+    started = time.perf_counter()
+    for message in messages:
+        automod.check(message)
+    elapsed = time.perf_counter() - started
+
+    # Let the queued bulk deletes run
+    await asyncio.sleep(settings['automod']['delete_delay'] * 2)
+    deleted = sum(c.deleted for c in channels)
+    calls = sum(c.delete_calls for c in channels)
+
+    print(f"🛡️ {len(messages):,} messages over {args.guilds} guilds x {args.channels} channels, "
+          f"{len(settings['automod']['denied_domains']):,} denied domains")
+    print(f"⚡ {len(messages) / elapsed:,.0f} checks/s ({elapsed / len(messages) * 1e6:.2f}µs per message)")
+    print(f"🚫 Flagged: " + ", ".join(f"{k} {v}" for k, v in automod.actions.items()))
+    print(f"🧹 Deleted {deleted:,} messages in {calls:,} bulk-delete calls")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AutoModerator.check throughput")
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--guilds', type=int, default=200)
+    parser.add_argument('--channels', type=int, default=5, help="channels per guild")
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--links', type=float, default=0.1, help="share of messages with a link")
+    parser.add_argument('--flood', type=float, default=0.01, help="share of picks that start a burst of 8 identical messages")
+    parser.add_argument('--denied', type=int, default=10000, help="extra denied domains in the index")
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
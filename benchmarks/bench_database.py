@@ -0,0 +1,131 @@
+"""Storage benchmarks: SQLiteDatabase against the old JSON-file store.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_database --users 2000
+
+The baseline needs aiofiles (pip install aiofiles), which the bot itself
+no longer uses.
+
+The JSON store is reproduced here as it was before the SQLite move
+(every call reads the whole file, writes rewrite it). It serves as a
+baseline: per-call cost should stay flat for SQLite as the data grows,
+while the JSON column grows with the file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+import aiofiles
+
+from utils.database import SQLiteDatabase
+
+class LegacyJSONDatabase:
+    """The original whole-file JSON store, kept only as a baseline"""
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+
+    async def read_data(self) -> Dict[str, Any]:
+        try:
+            async with aiofiles.open(self.db_file, 'r', encoding='utf-8') as f:
+                content = await f.read()
+                return json.loads(content) if content else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    async def write_data(self, data: Dict[str, Any]):
+        async with aiofiles.open(self.db_file, 'w', encoding='utf-8') as f:
+            await f.write(json.dumps(data, indent=4, ensure_ascii=False))
+
+    async def get_guild_settings(self, guild_id: str) -> Dict[str, Any]:
+        return (await self.read_data()).get('guilds', {}).get(guild_id, {})
+
+    async def set_guild_settings(self, guild_id: str, settings: Dict[str, Any]):
+        data = await self.read_data()
+        data.setdefault('guilds', {})[guild_id] = settings
+        await self.write_data(data)
+
+    async def get_user_data(self, user_id: str) -> Dict[str, Any]:
+        return (await self.read_data()).get('users', {}).get(user_id, {})
+
+    async def increment_user_requests(self, user_id: str):
+        data = await self.read_data()
+        user_data = data.setdefault('users', {}).setdefault(user_id, {})
+        user_data['total_requests'] = user_data.get('total_requests', 0) + 1
+        user_data['last_used'] = datetime.now().isoformat()
+        user_data.setdefault('first_used', user_data['last_used'])
+        await self.write_data(data)
+
+    async def close(self):
+        pass
+
+async def seed(db, users: int, guilds: int):
+    now = datetime.now().isoformat()
+    if isinstance(db, SQLiteDatabase):
+        await db.apply_request_batch({str(i): (1, now, now) for i in range(users)})
+    else:
+        await db.write_data({'users': {str(i): {'total_requests': 1, 'first_used': now, 'last_used': now} for i in range(users)}})
+    for g in range(guilds):
+        await db.set_guild_settings(str(g), {'ai_channels': [str(g * 10)], 'delete_links': True})
+
+async def timed(operation, count: int) -> float:
+    """Microseconds per call over ``count`` sequential calls"""
+    started = time.perf_counter()
+    for i in range(count):
+        await operation(i)
+    return (time.perf_counter() - started) / count * 1e6
+
+async def bench(db, users: int, calls: int) -> Dict[str, float]:
+    results = {
+        'get_guild_settings': await timed(lambda i: db.get_guild_settings(str(i % 50)), calls),
+        'set_guild_settings': await timed(lambda i: db.set_guild_settings(str(i % 50), {'ai_channels': [str(i)]}), calls),
+        'get_user_data': await timed(lambda i: db.get_user_data(str(i % users)), calls),
+        'increment_user_requests': await timed(lambda i: db.increment_user_requests(str(i % users)), calls),
+    }
+    # Concurrent increments, as many messages landing at once would issue
+    started = time.perf_counter()
+    await asyncio.gather(*(db.increment_user_requests(str(i % users)) for i in range(calls)))
+    results['increment x concurrent'] = (time.perf_counter() - started) / calls * 1e6
+    if isinstance(db, SQLiteDatabase):
+        now = datetime.now().isoformat()
+        batch = {str(i): (1, now, now) for i in range(min(users, 500))}
+        results['apply_request_batch(500)'] = await timed(lambda i: db.apply_request_batch(batch), 10)
+    return results
+
+async def run(users: int, calls: int):
+    workdir = tempfile.mkdtemp(prefix="bench-db-")
+    try:
+        stores = {
+            'sqlite': SQLiteDatabase(os.path.join(workdir, 'database.db'), legacy_file=os.path.join(workdir, 'none.json')),
+            'json (old)': LegacyJSONDatabase(os.path.join(workdir, 'database.json')),
+        }
+        results = {}
+        for name, db in stores.items():
+            await seed(db, users, 50)
+            results[name] = await bench(db, users, calls)
+            await db.close()
+
+        operations = list(results['sqlite'])
+        print(f"{users:,} users, {calls} calls per operation (µs per call)")
+        print(f"{'operation':<26}" + "".join(f"{name:>14}" for name in stores))
+        for operation in operations:
+            row = "".join(
+                f"{results[name][operation]:>14.1f}" if operation in results[name] else f"{'-':>14}"
+                for name in stores
+            )
+            print(f"{operation:<26}{row}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLiteDatabase vs the old JSON store")
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.calls))
@@ -0,0 +1,117 @@
+"""Gateway profile benchmark: cache memory, ready time and RSS.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_gateway
+    DISCORD_TOKEN=... python -m benchmarks.bench_gateway --live
+
+The default run replays synthetic GUILD_CREATE and MESSAGE_CREATE events
+into a disconnected client's cache under each profile and reports what
+the cache holds. ``--live`` logs in once per profile, in a fresh process
+each, and reports time to on_ready and RSS at that point.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from discord.ext import commands
+
+# app.py reads config.json from the working directory
+from app import gateway_options
+from utils.helpers import Helpers
+
+PROFILES = ('full', 'lean')
+
+def user_payload(user_id: int) -> dict:
+    return {'id': str(user_id), 'username': f"user{user_id}", 'discriminator': '0', 'avatar': None, 'global_name': None}
+
+def guild_payload(guild_id: int, members: int) -> dict:
+    return {
+        'id': str(guild_id),
+        'name': f"guild{guild_id}",
+        'member_count': members,
+        'roles': [{
+            'id': str(guild_id), 'name': '@everyone', 'permissions': '0', 'position': 0,
+            'color': 0, 'hoist': False, 'managed': False, 'mentionable': False
+        }],
+        'channels': [{'id': str(guild_id * 10), 'type': 0, 'name': 'chat', 'position': 0, 'permission_overwrites': []}],
+        'members': [{
+            'user': user_payload(guild_id * 1_000_000 + i), 'roles': [], 'flags': 0,
+            'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'mute': False
+        } for i in range(members)]
+    }
+
+def message_payload(message_id: int, guild_id: int) -> dict:
+    return {
+        'id': str(message_id), 'channel_id': str(guild_id * 10), 'guild_id': str(guild_id),
+        'author': user_payload(guild_id * 1_000_000), 'content': "hello there " * 10, 'type': 0,
+        'timestamp': '2024-01-01T00:00:00+00:00', 'edited_timestamp': None, 'tts': False, 'pinned': False,
+        'mention_everyone': False, 'mentions': [], 'mention_roles': [], 'attachments': [], 'embeds': []
+    }
+
+async def replay(profile: str, guilds: int, members: int, messages: int):
+    bot = commands.Bot(command_prefix="!", **gateway_options({'profile': profile}))
+    state = bot._connection
+    # Nothing is listening, skip event dispatch entirely
+    state.dispatch = lambda *args, **kwargs: None
+
+    guild_events = [guild_payload(guild_id, members) for guild_id in range(1, guilds + 1)]
+    message_events = [message_payload(10**17 + i, i % guilds + 1) for i in range(messages)]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    for data in guild_events:
+        state.parse_guild_create(data)
+    for data in message_events:
+        state.parse_message_create(data)
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    cached_members = sum(len(g.members) for g in bot.guilds)
+    cached_messages = len(state._messages) if state._messages is not None else 0
+    print(f"{profile:>6} {cached_members:>10,} {cached_messages:>10,} {current / 1048576:>10.1f} {elapsed * 1000:>10.1f}")
+
+def run_offline(guilds: int, members: int, messages: int):
+    print(f"{guilds} guilds x {members:,} members, {messages:,} messages")
+    print(f"{'profile':>6} {'members':>10} {'messages':>10} {'cache MB':>10} {'replay ms':>10}")
+    for profile in PROFILES:
+        asyncio.run(replay(profile, guilds, members, messages))
+
+def run_live_profile(profile: str):
+    """Log in, report ready time and RSS, then disconnect"""
+    started = time.perf_counter()
+    bot = commands.Bot(command_prefix="!", **gateway_options({'profile': profile}))
+
+    @bot.event
+    async def on_ready():
+        print(f"{profile:>6} {time.perf_counter() - started:>10.2f} {Helpers.rss_bytes() / 1048576:>10.1f} {len(bot.guilds):>8}")
+        await bot.close()
+
+    bot.run(os.environ["DISCORD_TOKEN"], log_handler=None)
+
+def run_live():
+    print(f"{'profile':>6} {'ready s':>10} {'RSS MB':>10} {'guilds':>8}")
+    for profile in PROFILES:
+        # A fresh process per profile so RSS is not shared between runs
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_gateway", "--live-profile", profile], check=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--live', action='store_true', help="log in with DISCORD_TOKEN under each profile")
+    parser.add_argument('--live-profile', choices=PROFILES, help=argparse.SUPPRESS)
+    parser.add_argument('--guilds', type=int, default=5)
+    parser.add_argument('--members', type=int, default=5000)
+    parser.add_argument('--messages', type=int, default=3000)
+    args = parser.parse_args()
+
+    if args.live_profile:
+        run_live_profile(args.live_profile)
+    elif args.live:
+        run_live()
+    else:
+        run_offline(args.guilds, args.members, args.messages)
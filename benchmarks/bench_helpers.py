@@ -0,0 +1,52 @@
+"""Micro-benchmarks for the text helpers.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_helpers
+
+The per-character cost of split_message should stay flat as inputs grow;
+a rising column means the splitter has gone super-linear.
+"""
+import random
+import time
+
+from utils.helpers import Helpers
+
+def make_text(size: int, seed: int = 0) -> str:
+    """Markdown-ish text mixing prose, paragraphs and code blocks"""
+    rng = random.Random(seed)
+    words = "the quick brown fox jumps over lazy dog discord bot reply token model".split()
+    parts = []
+    total = 0
+    while total < size:
+        if rng.random() < 0.2:
+            lines = [f"    value_{i} = compute({i})  # step {i}" for i in range(rng.randint(5, 60))]
+            part = "```python\n" + "\n".join(lines) + "\n```"
+        else:
+            sentences = [" ".join(rng.choice(words) for _ in range(rng.randint(5, 20))).capitalize() + "."
+                         for _ in range(rng.randint(1, 8))]
+            part = " ".join(sentences)
+        parts.append(part)
+        total += len(part) + 2
+    return "\n\n".join(parts)[:size]
+
+def bench(func, *args, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def run():
+    print(f"{'size':>10} {'chunks':>7} {'split ms':>10} {'ns/char':>8} {'clean ms':>10}")
+    for size in (2_000, 8_000, 32_000, 128_000, 512_000):
+        text = make_text(size)
+        chunks = Helpers.split_message(text)
+        assert all(len(chunk) <= 2000 for chunk in chunks)
+        split = bench(Helpers.split_message, text)
+        clean = bench(Helpers.clean_content, text, len(text))
+        print(f"{size:>10,} {len(chunks):>7} {split * 1000:>10.3f} {split / size * 1e9:>8.1f} {clean * 1000:>10.3f}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,80 @@
+"""Image job queue: generation, coalescing and cache hits with a stub backend.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_images --requests 200 --prompts 40 --concurrency 2
+
+Requests for a fixed set of prompts arrive at once and go through
+ImageJobQueue and ImageCache exactly as the image cog uses them, with
+benchmarks/stub_image.py standing in for the image API. The cache is
+capped small enough that eviction runs while images are being served.
+"""
+import argparse
+import asyncio
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.bench_load import percentile
+from benchmarks.stub_image import StubImageBackend
+from utils.image_cache import ImageCache
+from utils.image_jobs import ImageJobQueue, ImageQueueFull
+
+async def request(jobs: ImageJobQueue, prompt: str, upload_delay: float, results: dict):
+    try:
+        result = await jobs.generate(prompt, {'size': '256x256'})
+    except ImageQueueFull:
+        results['rejected'] += 1
+        return
+    try:
+        # Stands in for the upload; the file must survive until it's done
+        with open(result.path, 'rb') as f:
+            f.read()
+        await asyncio.sleep(upload_delay)
+        results['cached' if result.cached else 'generated'].append(result.seconds)
+    finally:
+        jobs.release(result)
+
+async def run(args):
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="bench-images-")
+    try:
+        backend = StubImageBackend(steps=args.steps, step_delay=args.step_delay, max_size=256)
+        cache = ImageCache(workdir, max_bytes=args.cache_kb * 1024)
+        jobs = ImageJobQueue(backend, cache, concurrency=args.concurrency, max_pending=args.max_pending)
+        prompts = [f"a picture of thing number {i}" for i in range(args.prompts)]
+        results = {'generated': [], 'cached': [], 'rejected': 0}
+
+        started = time.perf_counter()
+        tasks = []
+        for _ in range(args.requests):
+            tasks.append(asyncio.create_task(request(jobs, rng.choice(prompts), args.upload_delay, results)))
+            await asyncio.sleep(rng.expovariate(args.rate))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        print(f"🖼️ {args.requests} requests over {args.prompts} prompts in {elapsed:.1f}s, "
+              f"concurrency {args.concurrency}")
+        for name in ('generated', 'cached'):
+            samples = results[name]
+            print(f"   {name:<10}{len(samples):>5}  p50 {percentile(samples, 0.5) * 1000:8.1f}ms  "
+                  f"p95 {percentile(samples, 0.95) * 1000:8.1f}ms")
+        print(f"   rejected  {results['rejected']:>5}, coalesced {jobs.inflight.followers}")
+        print(f"💾 Cache: {len(cache)} files, {cache.total_bytes / 1024:.0f} KB, {cache.evictions} evictions")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ImageJobQueue with a stub backend")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--prompts', type=int, default=40)
+    parser.add_argument('--rate', type=float, default=50, help="requests per second")
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--max-pending', type=int, default=50)
+    parser.add_argument('--steps', type=int, default=4)
+    parser.add_argument('--step-delay', type=float, default=0.05)
+    parser.add_argument('--upload-delay', type=float, default=0.05, help="simulated upload time")
+    parser.add_argument('--cache-kb', type=int, default=20, help="cache size limit")
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
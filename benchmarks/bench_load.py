@@ -0,0 +1,249 @@
+"""Offline load test: synthetic messages through ChatGPTBot.on_message.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_load --rate 50 --duration 20 --guilds 100
+    python -m benchmarks.bench_load --rate 20 --rate-limit-every 10 --no-stream
+
+Messages arrive as a Poisson process spread over fake guilds, channels
+and users, all in AI channels. Replies come from a local stub of the
+Groq API (benchmarks/stub_llm.py), so nothing touches Discord or Groq.
+The bot runs in a scratch directory with its own database and config.
+Cooldowns and upstream rate limits are lifted by default, so the numbers
+measure the bot itself; --keep-limits restores the configured ones.
+
+Reports throughput, latency to first response and to complete reply
+(p50/p95/p99), where dropped messages went, event-loop lag and memory.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from benchmarks.fake_discord import FakeMessage, FakeUser, build_topology
+from benchmarks.stub_llm import StubLLMServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROMPTS = [
+    "hey, how are you?",
+    "what's the capital of france",
+    "tell me a joke",
+    "explain how vaccines work step by step",
+    "recommend a good book",
+    "what is the meaning of life",
+    "write a haiku about rain",
+    "how do I center a div",
+]
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def summarize(name: str, samples: List[float], unit: float = 1000.0, suffix: str = "ms") -> str:
+    return (f"{name:<22} p50 {percentile(samples, 0.5) * unit:8.1f}{suffix}  "
+            f"p95 {percentile(samples, 0.95) * unit:8.1f}{suffix}  "
+            f"p99 {percentile(samples, 0.99) * unit:8.1f}{suffix}  "
+            f"max {max(samples, default=0.0) * unit:8.1f}{suffix}")
+
+class LoopLagMonitor:
+    """Measures how late the loop wakes a sleeping task"""
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+def prepare_workdir(args) -> str:
+    """Scratch directory with a tuned copy of config.json"""
+    workdir = tempfile.mkdtemp(prefix="bench-load-")
+    with open(os.path.join(REPO_ROOT, 'config.json'), 'r') as f:
+        config = json.load(f)
+
+    settings = config['settings']
+    settings['health'] = dict(settings.get('health', {}), enabled=False)
+    settings['shared_state'] = {'backend': 'memory'}
+    settings['batching'] = dict(settings.get('batching', {}), enabled=args.batching)
+    settings['queue'] = dict(settings.get('queue', {}), workers=args.workers)
+    ai_settings = config['ai_settings']
+    ai_settings['streaming'] = args.stream
+    ai_settings['cache'] = dict(ai_settings.get('cache', {}), enabled=args.cache, persist_path=None)
+    if not args.keep_limits:
+        unlimited = {'rate': 10**9, 'per': 1}
+        settings['cooldowns'] = {'user': unlimited, 'channel': unlimited, 'guild': unlimited}
+        ai_settings['rate_limits'] = dict(
+            ai_settings.get('rate_limits', {}),
+            requests_per_minute=10**9,
+            tokens_per_minute=10**12
+        )
+
+    with open(os.path.join(workdir, 'config.json'), 'w') as f:
+        json.dump(config, f)
+    return workdir
+
+async def run(args):
+    stub = StubLLMServer(
+        port=args.port,
+        first_token_latency=args.latency,
+        token_interval=args.token_interval,
+        tokens=args.tokens,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    await stub.start()
+    os.environ['LLM_BASE_URL'] = stub.base_url
+    os.environ.setdefault('GROQ_API_KEY', 'stub-key')
+
+    # app.py reads config.json and opens data/ relative to the working directory
+    import aiohttp
+    import app
+
+    bot = app.ChatGPTBot()
+    bot.session = aiohttp.ClientSession()
+    await bot.guild_settings.load()
+    await bot.load_extension('cogs.ai_commands')
+
+    rng = random.Random(args.seed)
+    channels = build_topology(args.guilds, args.channels)
+    for channel in channels:
+        await bot.guild_settings.add_ai_channel(channel.guild.id, channel.id)
+    users = [FakeUser(10**6 + i) for i in range(args.users)]
+
+    # Track worker activity so the drain phase knows when replies are done
+    active = 0
+    handler = bot.ai_queue.handler
+    async def tracked(job):
+        nonlocal active
+        active += 1
+        try:
+            await handler(job)
+        finally:
+            active -= 1
+    bot.ai_queue.handler = tracked
+    bot.ai_queue.start()
+    bot.stats.start()
+
+    monitor = LoopLagMonitor()
+    rss_before = app.Helpers.rss_bytes()
+    if args.tracemalloc:
+        tracemalloc.start()
+    monitor.start()
+
+    messages: List[FakeMessage] = []
+    handlers = []
+    started = time.perf_counter()
+    next_at = started
+    deadline = started + args.duration
+    while next_at < deadline:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        prompt = rng.choice(PROMPTS)
+        if rng.random() >= args.repeat:
+            prompt = f"{prompt} (#{len(messages)})"
+        message = FakeMessage(len(messages) + 1, rng.choice(users), rng.choice(channels), prompt)
+        messages.append(message)
+        # discord.py runs each event as its own task
+        handlers.append(asyncio.create_task(bot.on_message(message)))
+        next_at += rng.expovariate(args.rate)
+    send_done = time.perf_counter()
+
+    await asyncio.gather(*handlers)
+    while active or bot.ai_queue.depth or (bot.batcher and len(bot.batcher)):
+        await asyncio.sleep(0.05)
+    finished = time.perf_counter()
+
+    await monitor.stop()
+    traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+    if args.tracemalloc:
+        tracemalloc.stop()
+    rss_after = app.Helpers.rss_bytes()
+
+    answered = [m for m in messages if m.first_response is not None]
+    first = [m.first_response - m.created for m in answered]
+    complete = [m.last_response - m.created for m in answered]
+    counters = bot.pipeline.counters
+    queue = bot.ai_queue.stats()
+
+    print(f"\n📨 Sent {len(messages)} messages in {send_done - started:.1f}s "
+          f"({len(messages) / (send_done - started):.1f}/s offered) "
+          f"over {args.guilds} guilds x {args.channels} channels, {args.users} users")
+    print(f"✅ Answered {len(answered)} in {finished - started:.1f}s "
+          f"({len(answered) / (finished - started):.1f} replies/s)")
+    print(f"🚦 Pipeline: " + ", ".join(f"{k} {v}" for k, v in counters.items()))
+    print(f"📥 Queue: processed {queue['processed']}, shed {queue['shed']}, errors {queue['errors']}, "
+          f"p95 wait {queue['p95_wait'] * 1000:.1f}ms")
+    ai_cog = bot.get_cog('AICommands')
+    print(f"🔁 Upstream: {stub.requests} requests, {stub.rate_limited} answered 429, "
+          f"{ai_cog.inflight.followers} coalesced, cache hit rate {ai_cog.cache.hit_rate:.0%}")
+    print(summarize("First response", first))
+    print(summarize("Complete reply", complete))
+    print(summarize("Event loop lag", monitor.samples))
+    memory = f"💾 RSS {rss_before / 1048576:.1f} MB -> {rss_after / 1048576:.1f} MB"
+    if traced_peak is not None:
+        memory += f", traced peak {traced_peak / 1048576:.1f} MB"
+    print(memory)
+
+    await bot.ai_queue.stop()
+    await bot.stats.stop()
+    await bot.remove_cog('AICommands')
+    await bot.session.close()
+    await bot.db.close()
+    await stub.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for ChatGPTBot.on_message")
+    parser.add_argument('--rate', type=float, default=20, help="messages per second")
+    parser.add_argument('--duration', type=float, default=10, help="seconds of traffic")
+    parser.add_argument('--guilds', type=int, default=50)
+    parser.add_argument('--channels', type=int, default=2, help="AI channels per guild")
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--repeat', type=float, default=0.3, help="share of prompts repeated verbatim")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.2, help="stub seconds to first token")
+    parser.add_argument('--token-interval', type=float, default=0.02)
+    parser.add_argument('--tokens', type=int, default=40)
+    parser.add_argument('--rate-limit-every', type=int, default=0, help="stub answers every Nth request with 429")
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--no-stream', dest='stream', action='store_false')
+    parser.add_argument('--no-cache', dest='cache', action='store_false')
+    parser.add_argument('--batching', action='store_true', help="turn message batching on")
+    parser.add_argument('--keep-limits', action='store_true', help="keep configured cooldowns and upstream limits")
+    parser.add_argument('--tracemalloc', action='store_true', help="trace Python allocations (slower)")
+    parser.add_argument('--port', type=int, default=8700)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = prepare_workdir(args)
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(workdir)
+    try:
+        asyncio.run(run(args))
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Minimal stand-ins for the discord.py objects on the message path.
+
+They carry only what ChatGPTBot.on_message, auto-moderation and the AI
+cog touch: ids, content, typing(), reply()/send(), edit() and
+delete_messages(). Every outgoing send and edit is timestamped so the
+harness can measure response latency.
+"""
+import time
+from typing import List, Optional
+
+class FakeUser:
+    def __init__(self, user_id: int, bot: bool = False):
+        self.id = user_id
+        self.bot = bot
+        self.name = f"user{user_id}"
+        self.display_name = self.name
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.name = f"guild{guild_id}"
+        # No member object for the bot, so permission checks are skipped
+        self.me = None
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakeSentMessage:
+    """A message the bot posted; edits are timestamped on the trigger"""
+    def __init__(self, trigger: Optional["FakeMessage"], content: Optional[str]):
+        self.trigger = trigger
+        self.content = content
+
+    async def edit(self, content: Optional[str] = None, **kwargs):
+        self.content = content
+        if self.trigger is not None:
+            self.trigger.record_response()
+        return self
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild: FakeGuild):
+        self.id = channel_id
+        self.guild = guild
+        self.sent = 0
+        self.deleted = 0
+        self.delete_calls = 0
+
+    def typing(self):
+        return _Typing()
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        # Continuation chunks of long replies, not attributed to a trigger
+        self.sent += 1
+        return FakeSentMessage(None, content)
+
+    async def delete_messages(self, messages, **kwargs):
+        self.delete_calls += 1
+        self.deleted += len(messages)
+
+class FakeMessage:
+    """An incoming user message"""
+
+    def __init__(self, message_id: int, author: FakeUser, channel: FakeChannel, content: str):
+        self.id = message_id
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+        self.created = time.perf_counter()
+        self.first_response: Optional[float] = None
+        self.last_response: Optional[float] = None
+        self.responses = 0
+
+    def record_response(self):
+        now = time.perf_counter()
+        if self.first_response is None:
+            self.first_response = now
+        self.last_response = now
+        self.responses += 1
+
+    async def reply(self, content: Optional[str] = None, **kwargs):
+        self.record_response()
+        return FakeSentMessage(self, content)
+
+def build_topology(guilds: int, channels_per_guild: int, first_id: int = 1000) -> List[FakeChannel]:
+    """Fake guilds with their channels, ids never overlapping"""
+    result = []
+    for g in range(guilds):
+        guild = FakeGuild(first_id + g)
+        for c in range(channels_per_guild):
+            result.append(FakeChannel(first_id * 1000 + g * channels_per_guild + c, guild))
+    return result
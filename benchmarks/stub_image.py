@@ -0,0 +1,56 @@
+"""Local stand-in for an image backend, for benchmarks only.
+
+The bot never loads it: a gradient presented as a generated image would
+be a fake answer. Benchmarks plug it into ImageJobQueue directly.
+"""
+import asyncio
+import hashlib
+import struct
+import zlib
+from typing import Any, Dict, Optional
+
+from utils.image_backends import ImageBackend, ProgressCallback
+
+def parse_size(size: str):
+    width, _, height = str(size).lower().partition('x')
+    return int(width), int(height or width)
+
+def encode_png(width: int, height: int, rows: bytes) -> bytes:
+    """Minimal 8-bit RGB PNG; ``rows`` holds each scanline prefixed by its filter byte"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows, 6)) + chunk(b"IEND", b"")
+
+class StubImageBackend(ImageBackend):
+    """Draws a gradient picked from the prompt's hash.
+
+    Needs no network or API key and reports progress over ``steps`` steps.
+    """
+    name = "stub"
+
+    def __init__(self, steps: int = 8, step_delay: float = 0.25, max_size: int = 512):
+        self.steps = steps
+        self.step_delay = step_delay
+        self.max_size = max_size
+
+    async def generate(self, prompt: str, params: Dict[str, Any], progress: Optional[ProgressCallback] = None) -> bytes:
+        width, height = parse_size(params.get('size', '512x512'))
+        width, height = min(width, self.max_size), min(height, self.max_size)
+        for step in range(self.steps):
+            if progress:
+                await progress('generating', step / self.steps)
+            await asyncio.sleep(self.step_delay)
+        # Encoding is CPU work; keep it off the event loop
+        return await asyncio.to_thread(self.draw, prompt, width, height)
+
+    @staticmethod
+    def draw(prompt: str, width: int, height: int) -> bytes:
+        digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+        start, end = digest[0:3], digest[3:6]
+        rows = bytearray()
+        for y in range(height):
+            t = y / max(1, height - 1)
+            pixel = bytes(int(a + (b - a) * t) for a, b in zip(start, end))
+            rows += b"\x00" + pixel * width
+        return encode_png(width, height, bytes(rows))
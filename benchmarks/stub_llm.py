@@ -0,0 +1,128 @@
+"""Local stand-in for Groq's OpenAI-compatible chat completions API.
+
+Serves POST /v1/chat/completions, streamed or not, with configurable
+latency and injected 429s. Point the bot at it with
+LLM_BASE_URL=http://127.0.0.1:<port>/v1. It also runs standalone:
+
+    python -m benchmarks.stub_llm --port 8700 --latency 0.5 --rate-limit-every 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Optional
+
+from aiohttp import web
+
+class StubLLMServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8700,
+        first_token_latency: float = 0.2,
+        token_interval: float = 0.02,
+        tokens: int = 40,
+        jitter: float = 0.2,
+        rate_limit_every: int = 0,
+        retry_after: float = 1.0,
+        seed: int = 0
+    ):
+        self.host = host
+        self.port = port
+        self.first_token_latency = first_token_latency
+        self.token_interval = token_interval
+        self.tokens = tokens
+        self.jitter = jitter
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.rate_limited = 0
+        self.streamed = 0
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_post('/v1/chat/completions', self.completions)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _delay(self, base: float) -> float:
+        return max(0.0, base * (1 + self.random.uniform(-self.jitter, self.jitter)))
+
+    async def completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.requests += 1
+        if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+            self.rate_limited += 1
+            return web.json_response(
+                {'error': {'message': "Rate limit reached (stub)"}},
+                status=429,
+                headers={'retry-after': str(self.retry_after)}
+            )
+
+        words = [f"word{i}" for i in range(self.tokens)]
+        prompt_tokens = sum(len(m.get('content', '')) for m in body.get('messages', [])) // 4 + 1
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': len(words)}
+        await asyncio.sleep(self._delay(self.first_token_latency))
+
+        if not body.get('stream'):
+            await asyncio.sleep(self._delay(self.token_interval) * len(words))
+            return web.json_response({
+                'choices': [{'message': {'role': 'assistant', 'content': " ".join(words)}}],
+                'usage': usage
+            })
+
+        self.streamed += 1
+        resp = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await resp.prepare(request)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(self._delay(self.token_interval))
+            chunk = {'choices': [{'delta': {'content': word + " "}}]}
+            await resp.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await resp.write(f"data: {json.dumps({'choices': [], 'x_groq': {'usage': usage}})}\n\n".encode())
+        await resp.write(b"data: [DONE]\n\n")
+        return resp
+
+async def serve(args):
+    server = StubLLMServer(
+        port=args.port,
+        first_token_latency=args.latency,
+        token_interval=args.token_interval,
+        tokens=args.tokens,
+        rate_limit_every=args.rate_limit_every
+    )
+    await server.start()
+    print(f"🧪 Stub LLM listening on {server.base_url}")
+    started = time.monotonic()
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"   {server.requests} requests, {server.rate_limited} rate limited, {time.monotonic() - started:.0f}s")
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub Groq chat completions server")
+    parser.add_argument('--port', type=int, default=8700)
+    parser.add_argument('--latency', type=float, default=0.2, help="seconds to first token")
+    parser.add_argument('--token-interval', type=float, default=0.02)
+    parser.add_argument('--tokens', type=int, default=40)
+    parser.add_argument('--rate-limit-every', type=int, default=0, help="answer every Nth request with a 429")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
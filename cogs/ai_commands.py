@@ -1,226 +1,338 @@
 import discord
-from discord.ext import commands, tasks
-import os
+from discord.ext import commands
+from discord import app_commands
 import json
+import os
 import asyncio
-import aiohttp
-from flask import Flask
-from datetime import datetime
-import traceback
-
-# Load config
-with open('config.json', 'r') as f:
-    config = json.load(f)
-
-# Flask app
-app = Flask(__name__)
-
-@app.route('/')
-def home():
-    return "🤖 DigamberGPT - Operational"
-
-def run_flask():
-    port = int(os.environ.get("PORT", 10000))
-    app.run(host='0.0.0.0', port=port)
+import time
+from datetime import datetime, timedelta
+from collections import deque
+from utils.llm_client import LLMClient, LLMError
+from utils.streaming import EditThrottle, StreamingReply
+from utils.memory import ConversationStore
+from utils.response_cache import ResponseCache
+from utils.singleflight import SingleFlight
+from utils.rate_limiter import UpstreamScheduler, PRIORITY_AUTO, PRIORITY_COMMAND
+from utils.model_router import ModelRouter
+from utils.helpers import Helpers
+from utils.metrics import metrics
 
-TOKEN = os.getenv("DISCORD_TOKEN")
+SYSTEM_PROMPT = """You are DigamberGPT, an advanced AI assistant created by DIGAMBER.
+You are helpful, creative, and intelligent.
+Never mention that you are an AI model or your training data.
+Respond naturally and helpfully."""
 
-class ChatGPTBot(commands.Bot):
-    def __init__(self):
-        intents = discord.Intents.all()
-        super().__init__(
-            command_prefix="!",
-            intents=intents,
-            help_command=None,
-            case_insensitive=True
+class AICommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        ai_settings = bot.config.get('ai_settings', {})
+        self.llm = LLMClient(
+            api_key=os.getenv("GROQ_API_KEY"),
+            session=bot.session,
+            timeout=ai_settings.get('request_timeout', 30),
+            max_concurrency=ai_settings.get('max_concurrency', 16)
+        )
+        self.router = ModelRouter.from_settings(ai_settings)
+        self.system_prompt = ai_settings.get('system_prompt', SYSTEM_PROMPT)
+        self.temperature = ai_settings.get('temperature', 0.7)
+        self.max_tokens = ai_settings.get('max_tokens', 1000)
+        self.streaming = ai_settings.get('streaming', True)
+        self.edit_throttle = EditThrottle(ai_settings.get('stream_edit_interval', 1.0))
+        self.first_token_times = deque(maxlen=500)
+        memory_settings = ai_settings.get('memory', {})
+        self.memory_scope = memory_settings.get('scope', 'user')
+        self.conversations = ConversationStore(
+            max_conversations=memory_settings.get('max_conversations', 5000),
+            max_tokens=memory_settings.get('max_tokens', 2000),
+            idle_ttl=memory_settings.get('idle_ttl', 1800)
+        )
+        cache_settings = ai_settings.get('cache', {})
+        self.cache_enabled = cache_settings.get('enabled', True)
+        # With a shared backend, replies are also cached there for other processes
+        shared_state = getattr(bot, 'shared_state', None)
+        self.shared_cache = shared_state if shared_state is not None and shared_state.shared else None
+        self.cache = ResponseCache(
+            max_entries=cache_settings.get('max_entries', 1000),
+            ttl=cache_settings.get('ttl', 3600),
+            persist_path=None if self.shared_cache else cache_settings.get('persist_path'),
+            near_duplicate=cache_settings.get('near_duplicate', False),
+            similarity=cache_settings.get('similarity', 0.9)
         )
-        self.config = config
-        self.start_time = datetime.now()
-        self.session = None
-        self.ai_channels = {}  # Store AI channels per server
+        self.cache.load()
+        self.inflight = SingleFlight()
+        self.rate_limits = ai_settings.get('rate_limits', {})
+        self.schedulers = {}
+        self.completion_reserve = self.rate_limits.get('completion_reserve', 300)
+        self.register_gauges()
 
-    async def setup_hook(self):
-        # Start session
-        self.session = aiohttp.ClientSession()
-        
-        # Load cogs
-        cogs = ['cogs.ai_commands', 'cogs.mod_commands']
-        
-        for cog in cogs:
-            try:
-                await self.load_extension(cog)
-                print(f"✅ Loaded: {cog}")
-            except Exception as e:
-                print(f"❌ Failed to load {cog}: {e}")
-                traceback.print_exc()
-        
-        # Sync commands with better handling
-        try:
-            print("🔄 Syncing slash commands...")
-            synced = await self.tree.sync()
-            print(f"✅ Successfully synced {len(synced)} slash commands")
-            
-            # Print all commands
-            for cmd in synced:
-                print(f"   - /{cmd.name}")
-                
-        except Exception as e:
-            print(f"❌ Slash command sync failed: {e}")
-            traceback.print_exc()
-        
-        # Start tasks
-        self.update_presence.start()
+    def register_gauges(self):
+        """Expose cache and coalescing counters through the metrics registry"""
+        metrics.gauge('bot_cache_lookups', lambda: {
+            (('result', 'hit'),): self.cache.hits,
+            (('result', 'near_hit'),): self.cache.near_hits,
+            (('result', 'miss'),): self.cache.misses
+        }, "Response cache lookups since start, by result")
+        metrics.gauge('bot_cache_hit_ratio', lambda: self.cache.hit_rate, "Share of lookups answered from the response cache")
+        metrics.gauge('bot_cache_entries', lambda: len(self.cache), "Entries in the response cache")
+        metrics.gauge('bot_inflight_coalesced', lambda: self.inflight.followers, "Requests that shared another request's completion")
+        metrics.gauge('bot_llm_upstream_queue_depth', lambda: self.queue_depth, "Requests waiting for the upstream rate limiter")
 
-    async def on_ready(self):
-        print(f"\n🚀 {self.user} is ONLINE!")
-        print(f"📊 Servers: {len(self.guilds)}")
-        print(f"👥 Users: {sum(g.member_count for g in self.guilds)}")
-        
-        # Print available commands
-        commands_list = [cmd.name for cmd in self.tree.get_commands()]
-        print(f"🎯 Available commands: {', '.join(commands_list)}")
-        
-        # Start Flask in background for Render
-        if os.environ.get('RENDER'):
-            import threading
-            threading.Thread(target=run_flask, daemon=True).start()
-            print("🌐 Flask server started")
+    def conversation_key(self, user_id, channel_id):
+        """Key a conversation by user or by channel, per memory scope"""
+        return channel_id if self.memory_scope == 'channel' else user_id
 
-    async def on_guild_join(self, guild):
-        """Auto-sync commands when bot joins new server"""
-        try:
-            await self.tree.sync(guild=guild)
-            print(f"✅ Commands synced for new server: {guild.name}")
-        except Exception as e:
-            print(f"❌ Failed to sync commands for {guild.name}: {e}")
+    def build_messages(self, user_input, conversation_key=None):
+        """Build the chat messages sent to the model"""
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if conversation_key is not None:
+            messages.extend(self.conversations.history(conversation_key))
+        messages.append({"role": "user", "content": user_input})
+        return messages
 
-    async def on_message(self, message):
-        if message.author.bot:
-            return
+    def estimate_tokens(self, messages):
+        """Tokens to charge a request against the per-minute budget"""
+        return sum(self.conversations.estimate_tokens(m['content']) for m in messages) + self.completion_reserve
 
-        # Check if message is in AI channel
-        guild_id = str(message.guild.id)
-        
-        if guild_id in self.ai_channels:
-            ai_channel_id = self.ai_channels[guild_id]
-            
-            # If message is in AI channel, process automatically
-            if str(message.channel.id) == ai_channel_id:
-                # Ignore commands
-                if not message.content.startswith('!'):
-                    await self.process_ai_message(message)
-                    return
-        
-        # Process commands for other channels
-        await self.process_commands(message)
+    def format_error(self, e):
+        """Turn an upstream failure into a user-facing message"""
+        error_msg = str(e)
+        status = e.status if isinstance(e, LLMError) else None
+        metrics.inc('bot_errors_total', where='llm', type=f"http_{status}" if status else type(e).__name__)
+        if status == 401 or "authentication" in error_msg.lower():
+            return "❌ **API Error:** Invalid Groq API key. Please check your environment variables."
+        elif status == 429 or "rate limit" in error_msg.lower():
+            return "⚠️ **Rate Limit:** Too many requests. Please try again in a moment."
+        else:
+            return f"❌ **Error:** {error_msg}"
 
-    async def process_ai_message(self, message):
-        """Process AI messages automatically"""
-        try:
-            # Get AI cog
-            ai_cog = self.get_cog('AICommands')
-            if ai_cog:
-                async with message.channel.typing():
-                    response = await ai_cog.get_ai_response(message.content)
-                    
-                    # Check if user wants image generation
-                    if any(word in message.content.lower() for word in ['image', 'picture', 'photo', 'generate image', 'draw', 'create image']):
-                        # Send image generation message
-                        await message.reply("🖼️ Image generation feature coming soon! Currently I can only chat.")
-                    else:
-                        # Send AI response
-                        await message.reply(response)
-                        
-        except Exception as e:
-            print(f"AI processing error: {e}")
+    def scheduler_for(self, model):
+        """Groq rate limits are per model, so each model gets its own budget"""
+        if model not in self.schedulers:
+            self.schedulers[model] = UpstreamScheduler(
+                requests_per_minute=self.rate_limits.get('requests_per_minute', 30),
+                tokens_per_minute=self.rate_limits.get('tokens_per_minute', 6000),
+                max_retries=self.rate_limits.get('max_retries', 3),
+                name=model
+            )
+        return self.schedulers[model]
 
-    @tasks.loop(minutes=10)
-    async def update_presence(self):
-        activities = [
-            discord.Activity(type=discord.ActivityType.watching, name=f"{len(self.guilds)} servers"),
-            discord.Activity(type=discord.ActivityType.listening, name="ChatGPT-style AI"),
-            discord.Activity(type=discord.ActivityType.playing, name="Auto-Response Mode")
-        ]
-        activity = activities[(datetime.now().minute // 10) % len(activities)]
-        await self.change_presence(activity=activity)
+    @property
+    def queue_depth(self):
+        return sum(s.queue_depth for s in self.schedulers.values())
 
-    async def close(self):
-        if self.session:
-            await self.session.close()
-        await super().close()
+    def upstream_healthy(self, max_failure_streak=5):
+        """Readiness check: a key is configured and some model is answering"""
+        return bool(os.getenv("GROQ_API_KEY")) and self.router.healthy(max_failure_streak)
 
-# Run bot
-if __name__ == "__main__":
-    bot = ChatGPTBot()
-    bot.run(TOKEN)
+    @staticmethod
+    def should_fall_back(e):
+        """Anything but a bad API key is worth trying on the next model"""
+        return isinstance(e, LLMError) and e.status != 401
 
-ye le app.py ki code and 👇 ye le
+    async def chat_with_fallback(self, models, messages, priority):
+        """Run a completion, moving down the model list on failure"""
+        tokens = self.estimate_tokens(messages)
+        for i, model in enumerate(models):
+            last = i == len(models) - 1
+            
+            async def call(model=model):
+                started = time.perf_counter()
+                reply = await self.llm.chat(
+                    model=model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens
+                )
+                elapsed = time.perf_counter() - started
+                self.router.record(model, elapsed)
+                metrics.observe('bot_llm_request_seconds', elapsed, model=model, mode='chat')
+                metrics.inc('bot_llm_requests_total', model=model, outcome='ok')
+                return reply
+            
+            try:
+                return await self.scheduler_for(model).run(call, priority=priority, tokens=tokens, retry=last)
+            except LLMError as e:
+                self.router.record(model, 0.0, ok=False)
+                metrics.inc('bot_llm_requests_total', model=model, outcome='error')
+                if last or not self.should_fall_back(e):
+                    raise
+                print(f"⚠️ {model} failed ({e}), falling back to {models[i + 1]}")
 
-import discord
-from discord.ext import commands
-from discord import app_commands
-import json
-import os
-from groq import Groq
-from datetime import datetime, timedelta
+    async def stream_with_fallback(self, models, messages, priority):
+        """Stream a completion, falling back only before the first token"""
+        tokens = self.estimate_tokens(messages)
+        for i, model in enumerate(models):
+            last = i == len(models) - 1
+            scheduler = self.scheduler_for(model)
+            attempt = 0
+            produced = False
+            while True:
+                await scheduler.acquire(priority, tokens)
+                started = time.perf_counter()
+                try:
+                    async for token in self.llm.stream_chat(
+                        model=model,
+                        messages=messages,
+                        temperature=self.temperature,
+                        max_tokens=self.max_tokens
+                    ):
+                        if not produced:
+                            produced = True
+                            metrics.observe('bot_llm_ttft_seconds', time.perf_counter() - started, model=model)
+                        yield token
+                    elapsed = time.perf_counter() - started
+                    self.router.record(model, elapsed)
+                    metrics.observe('bot_llm_request_seconds', elapsed, model=model, mode='stream')
+                    metrics.inc('bot_llm_requests_total', model=model, outcome='ok')
+                    return
+                except LLMError as e:
+                    self.router.record(model, 0.0, ok=False)
+                    metrics.inc('bot_llm_requests_total', model=model, outcome='error')
+                    # Never retry once the user has seen part of a reply
+                    if produced:
+                        raise
+                    if last and scheduler.should_retry(e, attempt):
+                        await scheduler.backoff(e, attempt)
+                        attempt += 1
+                        continue
+                    # Same as UpstreamScheduler.run: later requests wait out the 429
+                    scheduler.rate_limited_by(e)
+                    if last or not self.should_fall_back(e):
+                        raise
+                    print(f"⚠️ {model} failed ({e}), falling back to {models[i + 1]}")
+                    break
 
-class AICommands(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.groq = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        self.conversations = {}
-        self.user_stats = {}
-        self.cooldowns = {}
+    async def cached_reply(self, context, user_input):
+        """Local cache first, then the shared store other processes fill"""
+        if not self.cache_enabled:
+            return None
+        reply = self.cache.get(context, user_input)
+        if reply is None and self.shared_cache is not None:
+            reply = await self.shared_cache.get('response_cache', self.cache.key(context, user_input))
+            if reply is not None:
+                metrics.inc('bot_shared_cache_hits_total')
+                self.cache.set(context, user_input, reply)
+        return reply
 
-    async def get_ai_response(self, user_input):
+    async def store_reply(self, context, user_input, reply):
+        if not self.cache_enabled:
+            return
+        self.cache.set(context, user_input, reply)
+        if self.shared_cache is not None:
+            try:
+                await self.shared_cache.set('response_cache', self.cache.key(context, user_input), reply, ttl=self.cache.ttl)
+            except Exception as e:
+                # The reply is already cached locally, sharing it is best effort
+                metrics.inc('bot_errors_total', where='shared_cache', type=type(e).__name__)
+
+    async def get_ai_response(self, user_input, conversation_key=None, priority=PRIORITY_AUTO):
         """Get AI response - used by both commands and auto-response"""
         try:
             # Check if API key is set
             if not os.getenv("GROQ_API_KEY"):
                 return "❌ **Configuration Error:** Groq API key not set. Please check environment variables."
             
-            prompt = f"""
-You are DigamberGPT, an advanced AI assistant created by DIGAMBER. 
-You are helpful, creative, and intelligent. 
-Never mention that you are an AI model or your training data.
-Respond naturally and helpfully.
-
-User: {user_input}
-"""
+            messages = self.build_messages(user_input, conversation_key)
+            models = self.router.route(user_input, command=priority == PRIORITY_COMMAND)
+            context = self.cache.context_key(models[0], self.temperature, messages[:-1])
+            reply = await self.cached_reply(context, user_input)
             
-            response = self.groq.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=1000
-            )
+            if reply is None:
+                async def complete():
+                    reply = await self.chat_with_fallback(models, messages, priority)
+                    await self.store_reply(context, user_input, reply)
+                    return reply
+                
+                # Identical requests already in flight share one completion
+                reply = await self.inflight.do(self.cache.key(context, user_input), complete)
             
-            return response.choices[0].message.content
+            if conversation_key is not None:
+                self.conversations.add_exchange(conversation_key, user_input, reply)
+            return reply
             
         except Exception as e:
-            error_msg = str(e)
-            if "authentication" in error_msg.lower():
-                return "❌ **API Error:** Invalid Groq API key. Please check your environment variables."
-            elif "rate limit" in error_msg.lower():
-                return "⚠️ **Rate Limit:** Too many requests. Please try again in a moment."
-            else:
-                return f"❌ **Error:** {error_msg}"
+            return self.format_error(e)
+
+    async def stream_ai_response(self, user_input, conversation_key=None, priority=PRIORITY_AUTO):
+        """Yield the AI response token by token"""
+        if not os.getenv("GROQ_API_KEY"):
+            yield "❌ **Configuration Error:** Groq API key not set. Please check environment variables."
+            return
+
+        messages = self.build_messages(user_input, conversation_key)
+        models = self.router.route(user_input, command=priority == PRIORITY_COMMAND)
+        context = self.cache.context_key(models[0], self.temperature, messages[:-1])
+        cached = await self.cached_reply(context, user_input)
+        if cached is not None:
+            if conversation_key is not None:
+                self.conversations.add_exchange(conversation_key, user_input, cached)
+            yield cached
+            return
+
+        flight_key = self.cache.key(context, user_input)
+        shared = self.inflight.pending(flight_key)
+        if shared is not None:
+            # Someone is already asking this, wait for their answer
+            try:
+                reply = await asyncio.shield(shared)
+            except Exception as e:
+                yield self.format_error(e)
+                return
+            if conversation_key is not None:
+                self.conversations.add_exchange(conversation_key, user_input, reply)
+            yield reply
+            return
+
+        flight = self.inflight.begin(flight_key)
+        tokens = []
+        try:
+            async for token in self.stream_with_fallback(models, messages, priority):
+                tokens.append(token)
+                yield token
+            reply = "".join(tokens)
+            self.inflight.resolve(flight_key, reply, future=flight)
+        except Exception as e:
+            self.inflight.resolve(flight_key, error=e, future=flight)
+            yield ("\n\n" if tokens else "") + self.format_error(e)
+            return
+        finally:
+            # Covers the consumer abandoning the stream part-way; by now a
+            # new leader may own the key, so only this call's future is failed
+            self.inflight.resolve(flight_key, error=RuntimeError("Shared request was cancelled"), future=flight)
+
+        await self.store_reply(context, user_input, reply)
+        if conversation_key is not None:
+            self.conversations.add_exchange(conversation_key, user_input, reply)
+
+    async def send_streamed(self, send, channel_id, user_input, prefix="", conversation_key=None, priority=PRIORITY_AUTO):
+        """Stream a response into Discord through progressive edits"""
+        reply = StreamingReply(send, channel_id, self.edit_throttle, prefix=prefix)
+        text = await reply.consume(self.stream_ai_response(user_input, conversation_key, priority))
+        if reply.time_to_first_token is not None:
+            self.first_token_times.append(reply.time_to_first_token)
+            metrics.observe('bot_reply_ttft_seconds', reply.time_to_first_token)
+        return text
 
     @commands.hybrid_command(name="ask", description="Ask anything to AI")
     @app_commands.describe(question="Your question")
     async def ask_ai(self, ctx, question: str):
         """AI command for non-AI channels"""
         await ctx.defer()
+        self.update_stats(ctx.author.id)
         
-        reply = await self.get_ai_response(question)
-        await ctx.followup.send(f"**{ctx.author.display_name}:** {question}\n\n**DigamberGPT:** {reply}")
+        header = f"**{ctx.author.display_name}:** {question}\n\n**DigamberGPT:** "
+        key = self.conversation_key(ctx.author.id, ctx.channel.id)
+        if self.streaming:
+            await self.send_streamed(ctx.send, ctx.channel.id, question, prefix=header, conversation_key=key, priority=PRIORITY_COMMAND)
+        else:
+            reply = await self.get_ai_response(question, key, priority=PRIORITY_COMMAND)
+            await Helpers.send_long(ctx.send, ctx.send, header + reply)
 
     @commands.hybrid_command(name="clear", description="Clear your conversation history")
     async def clear_chat(self, ctx):
         """Clear AI conversation history"""
-        user_id = ctx.author.id
-        if user_id in self.conversations:
-            self.conversations[user_id] = []
+        key = self.conversation_key(ctx.author.id, ctx.channel.id)
+        if self.conversations.clear(key):
             await ctx.send("✅ Your conversation history cleared!")
         else:
             await ctx.send("ℹ️ No conversation history to clear.")
@@ -228,16 +340,16 @@ User: {user_input}
     @commands.hybrid_command(name="stats", description="Check your AI usage stats")
     async def user_stats(self, ctx):
         """Show user statistics"""
-        user_id = ctx.author.id
-        stats = self.user_stats.get(user_id, {"requests": 0, "first_use": datetime.now()})
+        stats = await self.bot.stats.get_user_stats(str(ctx.author.id))
+        first_use = stats.get('first_used')
         
         embed = discord.Embed(
             title="📊 Your AI Stats",
             color=0x3498db,
             timestamp=datetime.now()
         )
-        embed.add_field(name="Total Requests", value=stats["requests"], inline=True)
-        embed.add_field(name="First Use", value=stats["first_use"].strftime("%Y-%m-%d"), inline=True)
+        embed.add_field(name="Total Requests", value=stats.get('total_requests', 0), inline=True)
+        embed.add_field(name="First Use", value=first_use[:10] if first_use else "Never", inline=True)
         embed.set_footer(text="Keep exploring! 🚀")
         
         await ctx.send(embed=embed)
@@ -246,34 +358,84 @@ User: {user_input}
     async def ping(self, ctx):
         """Check bot latency"""
         latency = round(self.bot.latency * 1000)
-        await ctx.send(f"🏓 Pong! **Latency:** {latency}ms\n**Status:** Online ✅")
+        message = f"🏓 Pong! **Latency:** {latency}ms\n**Status:** Online ✅"
+        if self.first_token_times:
+            samples = sorted(self.first_token_times)
+            message += f"\n**First Token (median):** {round(samples[len(samples) // 2] * 1000)}ms"
+        if self.queue_depth:
+            message += f"\n**Upstream Queue:** {self.queue_depth} waiting"
+        if self.cache_enabled:
+            message += f"\n**Cache Hit Rate:** {self.cache.hit_rate:.0%} ({len(self.cache)} entries)"
+        await ctx.send(message)
+
+    @commands.hybrid_command(name="botstats", description="Show bot performance metrics")
+    async def metrics_snapshot(self, ctx):
+        """Show the same snapshot the /metrics endpoint exports"""
+        uptime = time.monotonic() - metrics.started
+        queue_wait = metrics.histogram('bot_queue_wait_seconds')
+        upstream_wait = metrics.histogram('bot_llm_queue_wait_seconds')
+        ttft = metrics.histogram('bot_llm_ttft_seconds')
+        total = metrics.histogram('bot_llm_request_seconds')
+        fmt = lambda h: f"p50 ≤{h.quantile(0.5):g}s · p95 ≤{h.quantile(0.95):g}s ({h.count})" if h.count else "No data"
+        
+        embed = discord.Embed(
+            title="📈 Bot Metrics",
+            color=0x2ecc71,
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Uptime", value=str(timedelta(seconds=int(uptime))), inline=True)
+        embed.add_field(name="Servers", value=len(self.bot.guilds), inline=True)
+        embed.add_field(name="Gateway Latency", value=f"{round(self.bot.latency * 1000)}ms", inline=True)
+        embed.add_field(name="Queue Wait", value=fmt(queue_wait), inline=True)
+        embed.add_field(name="Rate Limiter Wait", value=fmt(upstream_wait), inline=True)
+        embed.add_field(name="First Token", value=fmt(ttft), inline=True)
+        embed.add_field(name="Total LLM Time", value=fmt(total), inline=True)
+        embed.add_field(
+            name="Tokens",
+            value=f"{int(metrics.counter_total('bot_llm_tokens_total', kind='prompt')):,} in · "
+                  f"{int(metrics.counter_total('bot_llm_tokens_total', kind='completion')):,} out",
+            inline=True
+        )
+        embed.add_field(
+            name="Cache",
+            value=f"{self.cache.hit_rate:.0%} hits · {self.inflight.followers} coalesced",
+            inline=True
+        )
+        stages = sorted(metrics.counter_series('bot_pipeline_messages_total').items(), key=lambda item: -item[1])
+        embed.add_field(
+            name="Message Pipeline",
+            value=" · ".join(f"{dict(labels).get('stage')} {int(count):,}" for labels, count in stages) or "No messages yet",
+            inline=False
+        )
+        events = metrics.counter_total('bot_gateway_events_total')
+        embed.add_field(name="Gateway Events", value=f"{events / max(uptime / 60, 1):.1f}/min", inline=True)
+        
+        errors = sorted(metrics.counter_series('bot_errors_total').items(), key=lambda item: -item[1])[:5]
+        embed.add_field(
+            name="Errors",
+            value="\n".join(f"`{dict(labels).get('type')}` ({dict(labels).get('where')}): {int(count)}" for labels, count in errors) or "None 🎉",
+            inline=False
+        )
+        await ctx.send(embed=embed)
 
     @commands.hybrid_command(name="test", description="Test AI functionality")
     async def test_ai(self, ctx):
         """Test AI with simple question"""
         await ctx.defer()
-        response = await self.get_ai_response("Hello, who are you?")
+        response = await self.get_ai_response("Hello, who are you?", priority=PRIORITY_COMMAND)
         
         if "❌" in response or "⚠️" in response:
-            await ctx.followup.send(f"❌ **Test Failed:** {response}")
+            await ctx.send(f"❌ **Test Failed:** {response}")
         else:
-            await ctx.followup.send(f"✅ **Test Successful!**\n\n**AI Response:** {response}")
-
-    @commands.hybrid_command(name="setchannel", description="Set AI auto-response channel")
-    @commands.has_permissions(administrator=True)
-    async def set_channel(self, ctx, channel: discord.TextChannel):
-        """Set AI channel for auto-response"""
-        try:
-            self.bot.ai_channels[str(ctx.guild.id)] = str(channel.id)
-            await ctx.send(f"✅ **AI Channel Set!**\nI will auto-respond in {channel.mention}")
-        except Exception as e:
-            await ctx.send(f"❌ Error: {e}")
+            await Helpers.send_long(ctx.send, ctx.send, f"✅ **Test Successful!**\n\n**AI Response:** {response}")
 
     def update_stats(self, user_id):
         """Update user statistics"""
-        if user_id not in self.user_stats:
-            self.user_stats[user_id] = {"requests": 0, "first_use": datetime.now()}
-        self.user_stats[user_id]["requests"] += 1
+        self.bot.stats.record_request(str(user_id))
+
+    def cog_unload(self):
+        self.llm.close()
+        self.cache.save()
 
 async def setup(bot):
     await bot.add_cog(AICommands(bot))
@@ -44,5 +44,4 @@ class FunCommands(commands.Cog):
         await message.add_reaction("2️⃣")
 
 async def setup(bot):
-    await bot.add_cog(FunCommands(bot))async def setup(bot):
-    await bot.add_cog(ModCommands(bot))
+    await bot.add_cog(FunCommands(bot))
@@ -0,0 +1,124 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+import asyncio
+
+from utils.image_backends import ImageError, create_image_backend, image_backend_problem
+from utils.image_cache import ImageCache
+from utils.image_jobs import ImageJobQueue, ImageQueueFull
+from utils.metrics import metrics
+from utils.streaming import EditThrottle
+
+class ImageCommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        settings = bot.config.get('ai_settings', {}).get('image', {})
+        self.params = {'size': settings.get('size', '512x512')}
+        self.max_prompt_chars = settings.get('max_prompt_chars', 1000)
+        self.backend = create_image_backend(settings, bot.session)
+        self.cache = ImageCache(
+            settings.get('cache_dir', 'data/images'),
+            max_bytes=int(settings.get('cache_max_mb', 200) * 1024 * 1024)
+        )
+        self.jobs = ImageJobQueue(
+            self.backend,
+            self.cache,
+            concurrency=settings.get('concurrency', 2),
+            max_pending=settings.get('max_pending', 20),
+            timeout=settings.get('timeout', 120)
+        )
+        self.edit_throttle = EditThrottle(settings.get('progress_interval', 1.5))
+        # Auto-responses run detached from the AI workers; kept for shutdown
+        self.tasks = set()
+        self.register_gauges()
+
+    def register_gauges(self):
+        metrics.gauge('bot_image_cache_bytes', lambda: self.cache.total_bytes, "Bytes of generated images on disk")
+        metrics.gauge('bot_image_cache_entries', lambda: len(self.cache), "Generated images on disk")
+        metrics.gauge('bot_image_jobs_running', lambda: self.jobs.running, "Image generations in progress")
+        metrics.gauge('bot_image_jobs_waiting', lambda: self.jobs.waiting, "Image generations waiting for a slot")
+
+    async def cog_load(self):
+        # Walking the cache directory is disk-bound
+        await asyncio.to_thread(self.cache.load)
+        print(f"🖼️ Image backend: {self.backend.identity}, {len(self.cache)} cached images")
+
+    async def cog_unload(self):
+        for task in self.tasks:
+            task.cancel()
+        await self.backend.close()
+
+    def submit(self, send, channel_id, prompt):
+        """Generate in the background, so the caller's worker is free at once"""
+        task = asyncio.create_task(self._render_detached(send, channel_id, prompt))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _render_detached(self, send, channel_id, prompt):
+        try:
+            await self.render(send, channel_id, prompt)
+        except Exception as e:
+            metrics.inc('bot_errors_total', where='image_response', type=type(e).__name__)
+            print(f"Image request error: {e}")
+
+    async def render(self, send, channel_id, prompt):
+        """Generate an image and post it, editing one status message on the way"""
+        prompt = prompt.strip()[:self.max_prompt_chars]
+        status = None
+
+        async def progress(stage, fraction):
+            nonlocal status
+            filled = int(fraction * 10)
+            text = f"🎨 `{'█' * filled}{'░' * (10 - filled)}` {int(fraction * 100)}% - {stage}"
+            # Cache hits finish before any progress, and never post a status
+            if status is None:
+                status = await send(text)
+                self.edit_throttle.ready(channel_id)
+            elif self.edit_throttle.ready(channel_id):
+                try:
+                    await status.edit(content=text)
+                except discord.HTTPException:
+                    pass
+
+        try:
+            result = await self.jobs.generate(prompt, self.params, progress)
+        except ImageQueueFull:
+            text = "⏳ Too many images are being generated right now, please try again in a minute."
+        except ImageError as e:
+            text = f"❌ **Image Error:** {e}"
+        else:
+            caption = f"🖼️ **{discord.utils.escape_markdown(prompt[:200])}**"
+            if result.cached:
+                caption += " (cached)"
+            else:
+                caption += f" ({result.seconds:.1f}s)"
+            try:
+                file = discord.File(result.path, filename="image.png")
+                if status is None:
+                    await send(caption, file=file)
+                else:
+                    await status.edit(content=caption, attachments=[file])
+            finally:
+                self.jobs.release(result)
+            return
+
+        if status is None:
+            await send(text)
+        else:
+            await status.edit(content=text)
+
+    @commands.hybrid_command(name="image", description="Generate an image from a prompt")
+    @app_commands.describe(prompt="What the image should show")
+    async def generate_image(self, ctx, *, prompt: str):
+        """Generate an image"""
+        await ctx.defer()
+        self.bot.stats.record_request(str(ctx.author.id))
+        await self.render(ctx.send, ctx.channel.id, prompt)
+
+async def setup(bot):
+    # Without a real backend image requests get the "coming soon" reply
+    problem = image_backend_problem(bot.config.get('ai_settings', {}).get('image', {}))
+    if problem:
+        print(f"ℹ️ Image generation off: {problem}")
+        return
+    await bot.add_cog(ImageCommands(bot))
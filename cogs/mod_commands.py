@@ -2,22 +2,28 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import asyncio
+import re
+from datetime import timedelta
+
+from utils.purge import PurgeEngine, PurgeFilter
 
 class ModCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Channels with a purge in progress
+        self.purging = set()
 
-    @commands.hybrid_command(name="setchannel", description="Set AI auto-response channel for this server")
+    @commands.hybrid_command(name="setchannel", description="Add an AI auto-response channel for this server")
     @commands.has_permissions(administrator=True)
     @app_commands.describe(channel="Channel where AI will auto-respond to messages")
     async def set_ai_channel(self, ctx, channel: discord.TextChannel):
         """Set AI channel for auto-response"""
-        # Store in bot memory
-        self.bot.ai_channels[str(ctx.guild.id)] = str(channel.id)
+        # Saved to the database, survives restarts
+        await self.bot.guild_settings.add_ai_channel(ctx.guild.id, channel.id)
         
         embed = discord.Embed(
             title="✅ AI Channel Setup Complete",
-            description=f"**{channel.mention}** is now the AI channel!",
+            description=f"**{channel.mention}** is now an AI channel!",
             color=0x00ff00
         )
         embed.add_field(
@@ -31,25 +37,29 @@ class ModCommands(commands.Cog):
 
     @commands.hybrid_command(name="removechannel", description="Remove AI auto-response channel")
     @commands.has_permissions(administrator=True)
-    async def remove_ai_channel(self, ctx):
+    @app_commands.describe(channel="Channel to remove (leave empty to remove all)")
+    async def remove_ai_channel(self, ctx, channel: discord.TextChannel = None):
         """Remove AI channel"""
-        guild_id = str(ctx.guild.id)
-        if guild_id in self.bot.ai_channels:
-            del self.bot.ai_channels[guild_id]
+        removed = await self.bot.guild_settings.remove_ai_channel(ctx.guild.id, channel.id if channel else None)
+        if not removed:
+            await ctx.send("ℹ️ No AI channel was set for this server." if channel is None else f"ℹ️ {channel.mention} is not an AI channel.")
+        elif channel is None:
             await ctx.send("✅ AI auto-response disabled for this server.")
         else:
-            await ctx.send("ℹ️ No AI channel was set for this server.")
+            await ctx.send(f"✅ AI auto-response disabled in {channel.mention}.")
 
     @commands.hybrid_command(name="aistatus", description="Check AI channel status")
     async def ai_status(self, ctx):
         """Check AI channel status"""
-        guild_id = str(ctx.guild.id)
-        if guild_id in self.bot.ai_channels:
-            channel_id = self.bot.ai_channels[guild_id]
-            channel = ctx.guild.get_channel(int(channel_id))
+        channel_ids = self.bot.guild_settings.ai_channels(ctx.guild.id)
+        if channel_ids:
+            mentions = []
+            for channel_id in sorted(channel_ids):
+                channel = ctx.guild.get_channel(channel_id)
+                mentions.append(channel.mention if channel else f"Channel not found ({channel_id})")
             embed = discord.Embed(
                 title="🤖 AI Channel Status",
-                description=f"**Auto-Response Channel:** {channel.mention if channel else 'Channel not found'}\n\n**Mode:** ChatGPT-style (No commands needed)",
+                description=f"**Auto-Response Channels:** {', '.join(mentions)}\n\n**Mode:** ChatGPT-style (No commands needed)",
                 color=0x3498db
             )
         else:
@@ -61,17 +71,95 @@ class ModCommands(commands.Cog):
         
         await ctx.send(embed=embed)
 
-    @commands.hybrid_command(name="purge", description="Delete multiple messages")
+    @commands.hybrid_command(name="purge", description="Delete messages, optionally filtered")
     @commands.has_permissions(manage_messages=True)
-    @app_commands.describe(amount="Number of messages to delete (1-100)")
-    async def purge_messages(self, ctx, amount: int = 10):
-        """Bulk delete messages"""
-        if amount < 1 or amount > 100:
-            await ctx.send("❌ Amount must be between 1-100", ephemeral=True)
+    @commands.bot_has_permissions(manage_messages=True, read_message_history=True)
+    @app_commands.describe(
+        amount="Number of matching messages to delete",
+        user="Only delete messages from this user",
+        pattern="Only delete messages matching this regular expression",
+        links="Only delete messages containing links",
+        bots="Only delete messages from bots",
+        minutes="Only delete messages from the last N minutes"
+    )
+    async def purge_messages(
+        self,
+        ctx,
+        amount: int = 10,
+        user: discord.User = None,
+        pattern: str = None,
+        links: bool = False,
+        bots: bool = False,
+        minutes: int = None
+    ):
+        """Delete messages in bulk, streaming history page by page"""
+        settings = self.bot.config['settings'].get('purge', {})
+        max_amount = settings.get('max_amount', 5000)
+        if amount < 1 or amount > max_amount:
+            await ctx.send(f"❌ Amount must be between 1-{max_amount}", ephemeral=True)
+            return
+        if minutes is not None and minutes < 1:
+            await ctx.send("❌ Minutes must be at least 1", ephemeral=True)
+            return
+        if ctx.channel.id in self.purging:
+            await ctx.send("⏳ A purge is already running in this channel.", ephemeral=True)
+            return
+
+        try:
+            purge_filter = PurgeFilter(
+                author_ids={user.id} if user else None,
+                pattern=pattern,
+                links=links,
+                bots=bots,
+                after=discord.utils.utcnow() - timedelta(minutes=minutes) if minutes else None
+            )
+        except re.error as e:
+            await ctx.send(f"❌ Invalid pattern: {e}", ephemeral=True)
             return
-            
-        deleted = await ctx.channel.purge(limit=amount + 1)
-        await ctx.send(f"✅ Deleted {len(deleted) - 1} messages", delete_after=5)
+
+        # Progress goes to a regular channel message: an ephemeral followup
+        # can only be edited for 15 minutes, and purges that reach messages
+        # older than 14 days can run longer. Prefix invocations delete it
+        # together with the command when done
+        is_prefix = ctx.interaction is None
+        if not is_prefix:
+            await ctx.defer(ephemeral=True)
+            await ctx.send("🧹 Purge started, progress is posted in the channel.", ephemeral=True)
+        status = await ctx.channel.send(f"🧹 Purging up to {amount} messages...")
+
+        async def report(progress):
+            if progress.done:
+                text = f"✅ Deleted {progress.deleted} messages"
+                if progress.single_deleted:
+                    text += f" ({progress.single_deleted} older than 14 days, one by one)"
+                if progress.failed:
+                    text += f", {progress.failed} could not be deleted"
+                text += f" - scanned {progress.scanned}."
+            else:
+                text = f"🧹 Deleted {progress.deleted}/{amount}, scanned {progress.scanned} messages..."
+            await status.edit(content=text)
+
+        engine = PurgeEngine(
+            ctx.channel,
+            purge_filter,
+            limit=amount,
+            # Stops at `amount` matches; filtered purges may look further back
+            scan_limit=max(amount, settings.get('scan_limit', 10000)),
+            before=ctx.message if is_prefix else status,
+            extra=[ctx.message] if is_prefix else None,
+            single_delete_interval=settings.get('single_delete_interval', 1.0),
+            progress_interval=settings.get('progress_interval', 2.0),
+            on_progress=report
+        )
+        self.purging.add(ctx.channel.id)
+        try:
+            await engine.run()
+        except discord.Forbidden:
+            await status.edit(content="❌ I lost permission to delete messages here.")
+        finally:
+            self.purging.discard(ctx.channel.id)
+        if is_prefix:
+            await status.delete(delay=10)
 
 async def setup(bot):
     await bot.add_cog(ModCommands(bot))
@@ -0,0 +1,126 @@
+"""Run the bot as several shard clusters, one process per cluster.
+
+    python launcher.py [--processes N] [--shard-count N] [--force-sync]
+
+Each cluster is a separate `app.py` process running an AutoShardedBot
+over its share of the shards, so gateway traffic and CPU work spread
+over cores. Shared state goes through the SQLite backend (see
+settings.shared_state); clusters that exit are restarted.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+
+import aiohttp
+
+with open('config.json', 'r') as f:
+    config = json.load(f)
+
+TOKEN = os.getenv("DISCORD_TOKEN")
+GATEWAY_URL = "https://discord.com/api/v10/gateway/bot"
+
+async def recommended_sharding():
+    """Shard count and identify concurrency Discord recommends for this bot"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_URL, headers={"Authorization": f"Bot {TOKEN}"}) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+    return data['shards'], data.get('session_start_limit', {}).get('max_concurrency', 1)
+
+def plan_clusters(shard_count, processes):
+    """Split shard ids into contiguous, evenly sized clusters"""
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+    clusters, start = [], 0
+    for i in range(processes):
+        end = start + size + (1 if i < extra else 0)
+        clusters.append(list(range(start, end)))
+        start = end
+    return clusters
+
+class Launcher:
+    def __init__(self, clusters, shard_count, max_concurrency=1, force_sync=False, restart_delay=5):
+        self.clusters = clusters
+        self.shard_count = shard_count
+        self.max_concurrency = max_concurrency
+        self.force_sync = force_sync
+        self.restart_delay = restart_delay
+        self.processes = {}
+        self.stopping = False
+
+    def command(self, index):
+        args = [
+            sys.executable, "app.py",
+            "--cluster", str(index),
+            "--shard-count", str(self.shard_count),
+            "--shard-ids", ",".join(map(str, self.clusters[index]))
+        ]
+        if self.force_sync and index == 0:
+            args.append("--force-sync")
+        return args
+
+    async def supervise(self, index):
+        """Keep one cluster running until the launcher stops"""
+        while not self.stopping:
+            process = await asyncio.create_subprocess_exec(*self.command(index))
+            self.processes[index] = process
+            print(f"🚀 Cluster {index} started (pid {process.pid}, shards {self.clusters[index]})")
+            code = await process.wait()
+            if self.stopping:
+                break
+            print(f"⚠️ Cluster {index} exited with code {code}, restarting in {self.restart_delay}s")
+            await asyncio.sleep(self.restart_delay)
+
+    def stop(self):
+        self.stopping = True
+        for process in self.processes.values():
+            if process.returncode is None:
+                process.terminate()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                pass
+
+        tasks = []
+        for index, shard_ids in enumerate(self.clusters):
+            tasks.append(asyncio.create_task(self.supervise(index)))
+            # Discord allows max_concurrency identifies per 5 seconds
+            if index < len(self.clusters) - 1:
+                await asyncio.sleep(5 * len(shard_ids) / self.max_concurrency)
+            if self.stopping:
+                break
+        await asyncio.gather(*tasks)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run DigamberGPT as several shard clusters")
+    parser.add_argument('--processes', type=int, help="cluster processes to run (default: CPU count)")
+    parser.add_argument('--shard-count', type=int, help="total shards (default: Discord's recommendation)")
+    parser.add_argument('--force-sync', action='store_true', help="force a slash command sync in cluster 0")
+    args = parser.parse_args()
+
+    sharding = config['settings'].get('sharding', {})
+    shard_count = args.shard_count or sharding.get('shard_count')
+    max_concurrency = 1
+    if shard_count is None:
+        shard_count, max_concurrency = await recommended_sharding()
+    processes = args.processes or sharding.get('processes') or os.cpu_count() or 1
+
+    clusters = plan_clusters(shard_count, processes)
+    print(f"🧩 {shard_count} shards across {len(clusters)} processes")
+    await Launcher(
+        clusters,
+        shard_count,
+        max_concurrency=max_concurrency,
+        force_sync=args.force_sync,
+        restart_delay=sharding.get('restart_delay', 5)
+    ).run()
+
+if __name__ == "__main__":
+    asyncio.run(main())
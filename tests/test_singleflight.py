@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+from cogs.ai_commands import AICommands
+from utils.llm_client import LLMError
+from utils.singleflight import SingleFlight
+
+def test_resolve_with_future_leaves_newer_leader_alone():
+    async def scenario():
+        flight = SingleFlight()
+        old = flight.begin('k')
+        flight.resolve('k', error=LLMError("boom", status=500), future=old)
+        new = flight.begin('k')
+        flight.resolve('k', error=RuntimeError("late"), future=old)
+        assert flight.pending('k') is new and not new.done()
+        flight.resolve('k', "ok", future=new)
+        assert await new == "ok" and len(flight) == 0
+    asyncio.run(scenario())
+
+def test_failed_stream_closing_late_does_not_fail_next_leader(monkeypatch):
+    monkeypatch.setenv('GROQ_API_KEY', 'test-key')
+
+    async def scenario():
+        bot = SimpleNamespace(config={'ai_settings': {'cache': {'enabled': False}}}, session=None)
+        cog = AICommands(bot)
+        release = asyncio.Event()
+        calls = []
+
+        async def stream_with_fallback(models, messages, priority):
+            calls.append(1)
+            if len(calls) == 1:
+                raise LLMError("upstream failed", status=500)
+            yield "o"
+            await release.wait()
+            yield "k"
+        cog.stream_with_fallback = stream_with_fallback
+
+        # First leader fails and is parked on its error chunk, as while the
+        # consumer awaits the Discord send
+        first = cog.stream_ai_response("same question")
+        assert "Error" in await first.__anext__()
+
+        # A second leader starts streaming, and a follower joins it
+        second = cog.stream_ai_response("same question")
+        assert await second.__anext__() == "o"
+        follower = asyncio.create_task(cog.get_ai_response("same question"))
+        await asyncio.sleep(0)
+
+        # The first generator's cleanup must not touch the second leader's call
+        await first.aclose()
+        release.set()
+        assert [token async for token in second] == ["k"]
+        assert await follower == "ok"
+    asyncio.run(scenario())
@@ -0,0 +1,222 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+from utils.helpers import Helpers
+from utils.metrics import metrics
+
+class DomainIndex:
+    """Trie over reversed host labels.
+
+    "example.com" is stored as com -> example, so a lookup walks the host
+    right to left once and matches the entry itself and every subdomain of
+    it in O(length of the host), however many domains are listed.
+    """
+
+    _END = object()
+
+    def __init__(self, domains: Iterable[str] = ()):
+        self._root: Dict[Any, Any] = {}
+        self.size = 0
+        for domain in domains:
+            self.add(domain)
+
+    def add(self, domain: str):
+        node = self._root
+        for label in reversed(domain.lower().strip('.').split('.')):
+            node = node.setdefault(label, {})
+        if self._END not in node:
+            node[self._END] = True
+            self.size += 1
+
+    def matches(self, host: str) -> bool:
+        """True if the host or any parent domain of it is listed"""
+        node = self._root
+        for label in reversed(host.lower().rstrip('.').split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+class GuildRules:
+    """Compiled moderation rules for one guild"""
+    __slots__ = ('source', 'enabled', 'delete_links', 'allowed', 'denied', 'flood_threshold', 'flood_window')
+
+    def __init__(self, source: Dict[str, Any], defaults: Dict[str, Any], delete_links: bool,
+                 allowed: DomainIndex, denied: DomainIndex):
+        overrides = source.get('automod', {})
+        flood = dict(defaults.get('flood', {}), **overrides.get('flood', {}))
+        self.source = source
+        self.enabled = overrides.get('enabled', defaults.get('enabled', True))
+        self.delete_links = overrides.get('delete_links', source.get('delete_links', delete_links))
+        # Guilds without their own domain lists share the global indexes
+        self.allowed = self._extend(allowed, defaults.get('allowed_domains', []), overrides.get('allowed_domains'))
+        self.denied = self._extend(denied, defaults.get('denied_domains', []), overrides.get('denied_domains'))
+        self.flood_threshold = flood.get('threshold', 4)
+        self.flood_window = flood.get('window', 10.0)
+
+    @staticmethod
+    def _extend(shared: DomainIndex, base: List[str], extra: Optional[List[str]]) -> DomainIndex:
+        return DomainIndex(list(base) + list(extra)) if extra else shared
+
+class FloodWindow:
+    """Content hashes seen in one channel during the last ``window`` seconds"""
+    __slots__ = ('entries', 'counts')
+
+    def __init__(self):
+        self.entries: Deque[Tuple[float, int]] = deque()
+        self.counts: Dict[int, int] = {}
+
+    def add(self, digest: int, now: float, window: float) -> int:
+        """Record a message and return how often its content appeared in the window"""
+        cutoff = now - window
+        entries, counts = self.entries, self.counts
+        while entries and entries[0][0] < cutoff:
+            _, old = entries.popleft()
+            remaining = counts[old] - 1
+            if remaining:
+                counts[old] = remaining
+            else:
+                del counts[old]
+        entries.append((now, digest))
+        counts[digest] = counts.get(digest, 0) + 1
+        return counts[digest]
+
+class AutoModerator:
+    """Link filtering and duplicate-flood detection on the message path.
+
+    ``check`` is synchronous and allocation-light: one precompiled regex
+    scan, trie lookups per link host and a dict update per message. Rule
+    sets are compiled once per guild and rebuilt only when the guild's
+    settings object changes. Flagged messages are queued per channel and
+    removed together through bulk delete after a short delay.
+    """
+
+    _SPACE = re.compile(r"\s+")
+
+    def __init__(self, guild_settings, settings: Dict[str, Any]):
+        self.guild_settings = guild_settings
+        self.defaults = settings.get('automod', {})
+        self.delete_links = settings.get('delete_links', False)
+        self.delete_delay = self.defaults.get('delete_delay', 1.0)
+        self.notify = self.defaults.get('notify', True)
+        self.max_channels = self.defaults.get('max_channels', 10000)
+        self.allowed = DomainIndex(self.defaults.get('allowed_domains', []))
+        self.denied = DomainIndex(self.defaults.get('denied_domains', []))
+        self._rules: Dict[int, GuildRules] = {}
+        self._floods: "OrderedDict[int, FloodWindow]" = OrderedDict()
+        self._pending: Dict[int, Tuple[Any, List[discord.Message], Dict[str, int]]] = {}
+        # Running deletes; the loop itself only holds weak references
+        self._tasks: Set[asyncio.Task] = set()
+        self.actions = {'link': 0, 'denied_domain': 0, 'flood': 0}
+
+    def rules_for(self, guild_id: int) -> GuildRules:
+        settings = self.guild_settings.get(guild_id)
+        rules = self._rules.get(guild_id)
+        # GuildSettingsService replaces the dict on every update and hands
+        # out a fresh empty one for guilds that have no settings yet
+        if rules is None or (rules.source is not settings and (settings or rules.source)):
+            rules = self._rules[guild_id] = GuildRules(settings, self.defaults, self.delete_links, self.allowed, self.denied)
+        return rules
+
+    def link_violation(self, rules: GuildRules, content: str) -> Optional[str]:
+        for match in Helpers.LINK_PATTERN.finditer(content):
+            host = match.group(1)
+            if rules.denied.size and rules.denied.matches(host):
+                return 'denied_domain'
+            if rules.delete_links and not (rules.allowed.size and rules.allowed.matches(host)):
+                return 'link'
+        return None
+
+    def flood_count(self, rules: GuildRules, channel_id: int, author_id: int, lowered: str, now: float) -> int:
+        """Times this author posted the same text in the channel within the window"""
+        window = self._floods.get(channel_id)
+        if window is None:
+            window = self._floods[channel_id] = FloodWindow()
+            if len(self._floods) > self.max_channels:
+                self._floods.popitem(last=False)
+        else:
+            self._floods.move_to_end(channel_id)
+        # Keyed by author too, so a busy channel saying "gg" isn't a flood
+        digest = hash((author_id, self._SPACE.sub(' ', lowered).strip()))
+        return window.add(digest, now, rules.flood_window)
+
+    @staticmethod
+    def is_exempt(message: discord.Message) -> bool:
+        """Moderators are never filtered, and nothing is flagged where the bot can't delete"""
+        permissions = getattr(message.author, 'guild_permissions', None)
+        if permissions is not None and permissions.manage_messages:
+            return True
+        me = message.guild.me
+        return me is not None and not message.channel.permissions_for(me).manage_messages
+
+    def check(self, message: discord.Message) -> Optional[str]:
+        """Return the rule a guild message broke, queueing it for deletion"""
+        rules = self.rules_for(message.guild.id)
+        if not rules.enabled:
+            return None
+        content = message.content
+        if not content:
+            return None
+        lowered = content.lower()
+        reason = None
+        if '://' in content or 'www.' in lowered:
+            reason = self.link_violation(rules, content)
+        if reason is None and rules.flood_threshold:
+            if self.flood_count(rules, message.channel.id, message.author.id, lowered, time.monotonic()) > rules.flood_threshold:
+                reason = 'flood'
+        # Permissions are only worked out for the few messages that broke a rule
+        if reason is None or self.is_exempt(message):
+            return None
+
+        self.actions[reason] += 1
+        metrics.inc('bot_automod_actions_total', reason=reason)
+        self._queue_delete(message, reason)
+        return reason
+
+    def _queue_delete(self, message: discord.Message, reason: str):
+        channel = message.channel
+        pending = self._pending.get(channel.id)
+        if pending is None:
+            pending = self._pending[channel.id] = (channel, [], {})
+            asyncio.get_running_loop().call_later(self.delete_delay, self._flush, channel.id)
+        pending[1].append(message)
+        pending[2][reason] = pending[2].get(reason, 0) + 1
+        if len(pending[1]) >= 100:
+            self._flush(channel.id)
+
+    def _flush(self, channel_id: int):
+        pending = self._pending.pop(channel_id, None)
+        if pending is not None:
+            task = asyncio.create_task(self._delete(*pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _delete(self, channel, messages: List[discord.Message], reasons: Dict[str, int]):
+        try:
+            # One bulk-delete call covers up to 100 messages
+            await channel.delete_messages(messages, reason="Auto-moderation")
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            metrics.inc('bot_errors_total', where='automod', type=type(e).__name__)
+            print(f"❌ Auto-moderation delete failed in {channel.id}: {e}")
+            return
+
+        if self.notify:
+            notes = {
+                'link': "links aren't allowed here",
+                'denied_domain': "that site is blocked here",
+                'flood': "please don't repeat the same message"
+            }
+            text = ", ".join(notes[r] for r in reasons)
+            try:
+                await channel.send(f"🛡️ Removed {len(messages)} message{'s' if len(messages) != 1 else ''}: {text}.", delete_after=5)
+            except discord.HTTPException:
+                pass
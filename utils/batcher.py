@@ -0,0 +1,88 @@
+import asyncio
+import time
+from typing import Callable, Dict, List, Tuple
+
+import discord
+
+class _Batch:
+    __slots__ = ('messages', 'chars', 'started', 'timer')
+
+    def __init__(self):
+        self.messages: List[discord.Message] = []
+        self.chars = 0
+        self.started = time.monotonic()
+        self.timer = None
+
+class MessageBatcher:
+    """Debounce rapid-fire messages from one user in one channel.
+
+    Each message restarts a short timer; when it fires, the collected
+    messages are handed to ``dispatch`` together so they can be answered
+    with a single completion. A batch is also cut once it reaches
+    ``max_messages`` or has been open for ``max_wait`` seconds, and a
+    message that would push the merged prompt past ``max_chars`` starts a
+    new batch instead.
+    """
+
+    def __init__(
+        self,
+        dispatch: Callable[[List[discord.Message]], None],
+        window: float = 1.5,
+        max_messages: int = 5,
+        max_wait: float = 6.0,
+        max_chars: int = 4000
+    ):
+        self.dispatch = dispatch
+        self.window = window
+        self.max_messages = max_messages
+        self.max_wait = max_wait
+        self.max_chars = max_chars
+        self._batches: Dict[Tuple[int, int], _Batch] = {}
+        self.batches = 0
+        self.merged = 0
+
+    @staticmethod
+    def merge(messages: List[discord.Message]) -> str:
+        """Combine a batch into one prompt"""
+        return "\n".join(m.content.strip() for m in messages if m.content.strip())
+
+    def __len__(self) -> int:
+        return len(self._batches)
+
+    def is_open(self, channel_id: int, user_id: int) -> bool:
+        return (channel_id, user_id) in self._batches
+
+    def add(self, message: discord.Message):
+        key = (message.channel.id, message.author.id)
+        batch = self._batches.get(key)
+        length = len(message.content.strip())
+        # Merged prompts obey the same limit as single messages
+        if batch is not None and batch.chars + 1 + length > self.max_chars:
+            self._flush(key)
+            batch = None
+        if batch is None:
+            batch = self._batches[key] = _Batch()
+        elif batch.timer:
+            batch.timer.cancel()
+
+        batch.messages.append(message)
+        batch.chars += length + (1 if batch.chars else 0)
+        if len(batch.messages) >= self.max_messages or time.monotonic() - batch.started >= self.max_wait:
+            self._flush(key)
+        else:
+            batch.timer = asyncio.get_running_loop().call_later(self.window, self._flush, key)
+
+    def _flush(self, key: Tuple[int, int]):
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer:
+            batch.timer.cancel()
+        self.batches += 1
+        self.merged += len(batch.messages) - 1
+        self.dispatch(batch.messages)
+
+    def flush_all(self):
+        """Dispatch every open batch right away (used on shutdown)"""
+        for key in list(self._batches):
+            self._flush(key)
@@ -0,0 +1,41 @@
+import hashlib
+import json
+from typing import List, Optional
+
+from discord import app_commands
+
+class CommandSyncer:
+    """Sync the global command tree only when it has changed.
+
+    The fingerprint is a SHA-256 of the serialized command payloads, the
+    same JSON Discord receives on sync, and is stored per application in
+    the database so restarts with an unchanged tree skip the API call.
+    """
+
+    def __init__(self, tree: app_commands.CommandTree, db):
+        self.tree = tree
+        self.db = db
+
+    def payload(self) -> List[dict]:
+        # Command.to_dict takes the tree since discord.py 2.4 (the minimum in requirements.txt)
+        commands = self.tree.get_commands()
+        return sorted((cmd.to_dict(self.tree) for cmd in commands), key=lambda c: (c.get('type', 1), c['name']))
+
+    def fingerprint(self) -> str:
+        encoded = json.dumps(self.payload(), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _key(application_id: Optional[int]) -> str:
+        return f"command_tree_hash:{application_id}"
+
+    async def sync(self, application_id: Optional[int], force: bool = False) -> Optional[list]:
+        """Sync if the fingerprint changed (or ``force``), returns the synced commands or None if skipped"""
+        fingerprint = self.fingerprint()
+        stored = await self.db.get_value(self._key(application_id))
+        if not force and stored == fingerprint:
+            return None
+        synced = await self.tree.sync()
+        # Only remember the hash once Discord has accepted the tree
+        await self.db.set_value(self._key(application_id), fingerprint)
+        return synced
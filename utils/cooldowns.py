@@ -0,0 +1,115 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+class SlidingWindowLimiter:
+    """O(1) sliding-window rate limiter.
+
+    Each key keeps only the counts for the current and previous fixed
+    window; the sliding count is the current count plus the previous one
+    weighted by how much of it still overlaps the window. Keys are kept in
+    last-seen order so idle ones are evicted from the front.
+    """
+
+    def __init__(self, rate: int, per: float, max_keys: int = 100000):
+        self.rate = rate
+        self.per = per
+        self.max_keys = max_keys
+        # key -> [window_start, previous_count, current_count, last_seen]
+        self._windows: "OrderedDict[Hashable, List[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def _evict(self, now: float):
+        idle_cutoff = now - 2 * self.per
+        while self._windows:
+            key, state = next(iter(self._windows.items()))
+            if state[3] >= idle_cutoff and len(self._windows) <= self.max_keys:
+                break
+            del self._windows[key]
+
+    def _state(self, key: Hashable, now: float) -> List[float]:
+        state = self._windows.get(key)
+        if state is None:
+            state = self._windows[key] = [now, 0, 0, now]
+            return state
+
+        self._windows.move_to_end(key)
+        elapsed = now - state[0]
+        if elapsed >= 2 * self.per:
+            state[0], state[1], state[2] = now, 0, 0
+        elif elapsed >= self.per:
+            state[0], state[1], state[2] = state[0] + self.per, state[2], 0
+        return state
+
+    def retry_after(self, key: Hashable, now: Optional[float] = None) -> float:
+        """Seconds until the key may act again, 0 if it may act now"""
+        now = time.monotonic() if now is None else now
+        self._evict(now)
+        state = self._state(key, now)
+        state[3] = now
+        estimate = state[1] * (1 - (now - state[0]) / self.per) + state[2]
+        if estimate < self.rate:
+            return 0.0
+        if state[2] >= self.rate:
+            return state[0] + self.per - now
+        # Wait until enough of the previous window has slid out
+        return (estimate - self.rate) / state[1] * self.per + 0.01
+
+    def hit(self, key: Hashable, now: Optional[float] = None):
+        """Record one action for the key"""
+        now = time.monotonic() if now is None else now
+        state = self._state(key, now)
+        state[2] += 1
+        state[3] = now
+
+class CooldownManager:
+    """Per-user, per-channel and per-guild limits checked together.
+
+    Channel and guild limits always stay in-process, because a guild's
+    traffic arrives on one shard. Users span shards, so when a shared
+    backend is given the user limit is kept there instead.
+    """
+    SHARED_SCOPES = ('user',)
+
+    def __init__(self, limits: Dict[str, Dict[str, float]], backend=None):
+        limits = {scope: limit for scope, limit in limits.items() if limit}
+        self.backend = backend if backend is not None and backend.shared else None
+        self.shared_limits = {
+            scope: (int(limit['rate']), float(limit['per']))
+            for scope, limit in limits.items()
+            if self.backend and scope in self.SHARED_SCOPES
+        }
+        self.limiters = {
+            scope: SlidingWindowLimiter(int(limit['rate']), float(limit['per']))
+            for scope, limit in limits.items()
+            if scope not in self.shared_limits
+        }
+        self.blocked = {scope: 0 for scope in limits}
+
+    async def check(self, user_id: int, channel_id: int, guild_id: Optional[int]) -> float:
+        """Record a message if allowed, otherwise return seconds to wait"""
+        keys = {'user': user_id, 'channel': channel_id, 'guild': guild_id}
+        now = time.monotonic()
+        for scope, limiter in self.limiters.items():
+            key = keys.get(scope)
+            if key is None:
+                continue
+            wait = limiter.retry_after(key, now)
+            if wait > 0:
+                self.blocked[scope] += 1
+                return wait
+
+        # Shared limits are checked and recorded in one step
+        for scope, (rate, per) in self.shared_limits.items():
+            wait = await self.backend.acquire(f"cooldown:{scope}", str(keys[scope]), rate, per)
+            if wait > 0:
+                self.blocked[scope] += 1
+                return wait
+
+        for scope, limiter in self.limiters.items():
+            key = keys.get(scope)
+            if key is not None:
+                limiter.hit(key, now)
+        return 0.0
@@ -1,84 +1,287 @@
 import json
-import aiofiles
 import asyncio
 import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Tuple
 
-class JSONDatabase:
-    def __init__(self, db_file: str = "data/database.json"):
+USER_COLUMNS = ('total_requests', 'first_used', 'last_used')
+
+class SQLiteDatabase:
+    """Keyed storage on SQLite in WAL mode.
+
+    Every statement runs on one dedicated worker thread, so there is a
+    single writer and the event loop never blocks on disk I/O. Reads and
+    writes touch only the rows they need instead of the whole file.
+    """
+
+    def __init__(self, db_file: str = "data/database.db", legacy_file: str = "data/database.json"):
         self.db_file = db_file
+        self.legacy_file = legacy_file
         self.ensure_directory()
+        self._executor = None
+        self._conn = None
+        self._write_lock = asyncio.Lock()
 
     def ensure_directory(self):
         """Ensure data directory exists"""
         os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
 
-    async def read_data(self) -> Dict[str, Any]:
-        """Read data from JSON file"""
+    async def _run(self, func, *args):
+        """Run a blocking database call on the worker thread"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _write(self, func, *args):
+        async with self._write_lock:
+            return await self._run(func, *args)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_file, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS guilds (
+                    guild_id TEXT PRIMARY KEY,
+                    settings TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id TEXT PRIMARY KEY,
+                    total_requests INTEGER NOT NULL DEFAULT 0,
+                    first_used TEXT,
+                    last_used TEXT,
+                    data TEXT NOT NULL DEFAULT '{}'
+                );
+                CREATE TABLE IF NOT EXISTS kv (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+            """)
+            self._conn = conn
+            self._migrate_legacy()
+        return self._conn
+
+    def _migrate_legacy(self):
+        """One-shot import of the old whole-file JSON database"""
+        if not os.path.exists(self.legacy_file):
+            return
         try:
-            async with aiofiles.open(self.db_file, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                return json.loads(content) if content else {}
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            data = json.loads(content) if content else {}
+        except json.JSONDecodeError:
+            print(f"⚠️ Skipping migration, {self.legacy_file} is not valid JSON")
+            return
+
+        self._replace_all(data)
+        os.replace(self.legacy_file, self.legacy_file + ".migrated")
+        print(f"✅ Migrated {self.legacy_file} to {self.db_file}")
+
+    @staticmethod
+    def _split_user(user_data: Dict[str, Any]):
+        extra = {k: v for k, v in user_data.items() if k not in USER_COLUMNS}
+        return (
+            int(user_data.get('total_requests', 0)),
+            user_data.get('first_used'),
+            user_data.get('last_used'),
+            json.dumps(extra, ensure_ascii=False)
+        )
+
+    @staticmethod
+    def _join_user(row) -> Dict[str, Any]:
+        total_requests, first_used, last_used, data = row
+        user_data = json.loads(data)
+        user_data['total_requests'] = total_requests
+        if first_used is not None:
+            user_data['first_used'] = first_used
+        if last_used is not None:
+            user_data['last_used'] = last_used
+        return user_data
+
+    def _put_user(self, conn, user_id: str, user_data: Dict[str, Any]):
+        conn.execute(
+            "INSERT OR REPLACE INTO users (user_id, total_requests, first_used, last_used, data) VALUES (?, ?, ?, ?, ?)",
+            (user_id, *self._split_user(user_data))
+        )
+
+    def _replace_all(self, data: Dict[str, Any]):
+        conn = self._conn
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM guilds")
+            conn.execute("DELETE FROM users")
+            conn.execute("DELETE FROM kv")
+            conn.executemany(
+                "INSERT INTO guilds (guild_id, settings) VALUES (?, ?)",
+                [(gid, json.dumps(s, ensure_ascii=False)) for gid, s in data.get('guilds', {}).items()]
+            )
+            for user_id, user_data in data.get('users', {}).items():
+                self._put_user(conn, user_id, user_data)
+            for key, value in data.items():
+                if key not in ('guilds', 'users'):
+                    conn.execute("INSERT INTO kv (key, value) VALUES (?, ?)", (key, json.dumps(value, ensure_ascii=False)))
+
+    def _dump_all(self) -> Dict[str, Any]:
+        conn = self._connection()
+        data = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM kv")}
+        guilds = {gid: json.loads(s) for gid, s in conn.execute("SELECT guild_id, settings FROM guilds")}
+        users = {
+            row[0]: self._join_user(row[1:])
+            for row in conn.execute("SELECT user_id, total_requests, first_used, last_used, data FROM users")
+        }
+        if guilds:
+            data['guilds'] = guilds
+        if users:
+            data['users'] = users
+        return data
+
+    async def read_data(self) -> Dict[str, Any]:
+        """Read the whole database as a dict (for exports and debugging)"""
+        return await self._run(self._dump_all)
 
     async def write_data(self, data: Dict[str, Any]):
-        """Write data to JSON file"""
-        async with aiofiles.open(self.db_file, 'w', encoding='utf-8') as f:
-            await f.write(json.dumps(data, indent=4, ensure_ascii=False))
+        """Replace the whole database with the given dict"""
+        def write():
+            self._connection()
+            self._replace_all(data)
+        await self._write(write)
 
     async def get_guild_settings(self, guild_id: str) -> Dict[str, Any]:
         """Get guild-specific settings"""
-        data = await self.read_data()
-        return data.get('guilds', {}).get(guild_id, {})
+        def read():
+            row = self._connection().execute("SELECT settings FROM guilds WHERE guild_id = ?", (guild_id,)).fetchone()
+            return json.loads(row[0]) if row else {}
+        return await self._run(read)
+
+    async def get_all_guild_settings(self) -> Dict[str, Dict[str, Any]]:
+        """Get settings for every guild"""
+        def read():
+            rows = self._connection().execute("SELECT guild_id, settings FROM guilds")
+            return {guild_id: json.loads(settings) for guild_id, settings in rows}
+        return await self._run(read)
 
     async def set_guild_settings(self, guild_id: str, settings: Dict[str, Any]):
         """Set guild-specific settings"""
-        data = await self.read_data()
-        if 'guilds' not in data:
-            data['guilds'] = {}
-        data['guilds'][guild_id] = settings
-        await self.write_data(data)
+        def write():
+            self._connection().execute(
+                "INSERT OR REPLACE INTO guilds (guild_id, settings) VALUES (?, ?)",
+                (guild_id, json.dumps(settings, ensure_ascii=False))
+            )
+        await self._write(write)
 
     async def get_user_data(self, user_id: str) -> Dict[str, Any]:
         """Get user-specific data"""
-        data = await self.read_data()
-        return data.get('users', {}).get(user_id, {})
+        def read():
+            row = self._connection().execute(
+                "SELECT total_requests, first_used, last_used, data FROM users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            return self._join_user(row) if row else {}
+        return await self._run(read)
 
     async def set_user_data(self, user_id: str, user_data: Dict[str, Any]):
         """Set user-specific data"""
-        data = await self.read_data()
-        if 'users' not in data:
-            data['users'] = {}
-        data['users'][user_id] = user_data
-        await self.write_data(data)
+        await self._write(lambda: self._put_user(self._connection(), user_id, user_data))
 
     async def increment_user_requests(self, user_id: str):
         """Increment user request count"""
-        user_data = await self.get_user_data(user_id)
-        user_data['total_requests'] = user_data.get('total_requests', 0) + 1
-        user_data['last_used'] = datetime.now().isoformat()
-        
-        if 'first_used' not in user_data:
-            user_data['first_used'] = datetime.now().isoformat()
-            
-        await self.set_user_data(user_id, user_data)
+        now = datetime.now().isoformat()
+        def write():
+            self._connection().execute("""
+                INSERT INTO users (user_id, total_requests, first_used, last_used) VALUES (?, 1, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    total_requests = total_requests + 1,
+                    first_used = COALESCE(first_used, excluded.first_used),
+                    last_used = excluded.last_used
+            """, (user_id, now, now))
+        await self._write(write)
+
+    async def apply_request_batch(self, increments: Dict[str, Tuple[int, str, str]]):
+        """Apply buffered request counts in one transaction.
+
+        ``increments`` maps user id to (count, first_used, last_used). The
+        global request and unique-user totals are updated alongside.
+        """
+        def write():
+            conn = self._connection()
+            with conn:
+                # Take the write lock up front, other bot processes may share the file
+                conn.execute("BEGIN IMMEDIATE")
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO users (user_id, first_used) VALUES (?, ?)",
+                    [(user_id, first) for user_id, (_, first, _) in increments.items()]
+                )
+                new_users = conn.total_changes - before
+                conn.executemany("""
+                    UPDATE users SET
+                        total_requests = total_requests + ?,
+                        first_used = COALESCE(first_used, ?),
+                        last_used = ?
+                    WHERE user_id = ?
+                """, [(count, first, last, user_id) for user_id, (count, first, last) in increments.items()])
+
+                row = conn.execute("SELECT value FROM kv WHERE key = 'global_stats'").fetchone()
+                stats = json.loads(row[0]) if row else {'total_requests': 0, 'unique_users': 0, 'guild_count': 0}
+                stats['total_requests'] = stats.get('total_requests', 0) + sum(c for c, _, _ in increments.values())
+                stats['unique_users'] = stats.get('unique_users', 0) + new_users
+                conn.execute(
+                    "INSERT OR REPLACE INTO kv (key, value) VALUES ('global_stats', ?)",
+                    (json.dumps(stats, ensure_ascii=False),)
+                )
+        await self._write(write)
 
     async def get_global_stats(self) -> Dict[str, Any]:
         """Get global bot statistics"""
-        data = await self.read_data()
-        return data.get('global_stats', {
+        def read():
+            row = self._connection().execute("SELECT value FROM kv WHERE key = 'global_stats'").fetchone()
+            return json.loads(row[0]) if row else None
+        stats = await self._run(read)
+        return stats if stats is not None else {
             'total_requests': 0,
             'unique_users': 0,
             'guild_count': 0
-        })
+        }
 
     async def update_global_stats(self, stats: Dict[str, Any]):
         """Update global bot statistics"""
-        data = await self.read_data()
-        data['global_stats'] = stats
-        await self.write_data(data)
+        def write():
+            self._connection().execute(
+                "INSERT OR REPLACE INTO kv (key, value) VALUES ('global_stats', ?)",
+                (json.dumps(stats, ensure_ascii=False),)
+            )
+        await self._write(write)
+
+    async def get_value(self, key: str, default: Any = None) -> Any:
+        """Read a JSON value from the key-value table"""
+        def read():
+            row = self._connection().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+            return json.loads(row[0]) if row else default
+        return await self._run(read)
+
+    async def set_value(self, key: str, value: Any):
+        """Write a JSON value to the key-value table"""
+        def write():
+            self._connection().execute(
+                "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+                (key, json.dumps(value, ensure_ascii=False))
+            )
+        await self._write(write)
+
+    async def close(self):
+        """Close the connection and stop the worker thread"""
+        if self._executor is None:
+            return
+        def close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(close)
+        self._executor.shutdown(wait=True)
+        self._executor = None
 
 # Database instance
-db = JSONDatabase()
+db = SQLiteDatabase()
@@ -0,0 +1,61 @@
+from typing import Any, Dict, Set
+
+class GuildSettingsService:
+    """In-memory index of guild settings with write-through persistence.
+
+    Everything is loaded once at startup; lookups on the message path are
+    plain dict/set membership on integer ids and never touch storage.
+    Changes update the index and are written straight to the database.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self._settings: Dict[int, Dict[str, Any]] = {}
+        self._ai_channels: Dict[int, Set[int]] = {}
+
+    async def load(self):
+        """Build the index from storage"""
+        stored = await self.database.get_all_guild_settings()
+        self._settings = {int(guild_id): settings for guild_id, settings in stored.items()}
+        self._ai_channels = {
+            guild_id: {int(cid) for cid in settings.get('ai_channels', [])}
+            for guild_id, settings in self._settings.items()
+            if settings.get('ai_channels')
+        }
+        print(f"✅ Loaded settings for {len(self._settings)} servers")
+
+    def get(self, guild_id: int) -> Dict[str, Any]:
+        return self._settings.get(guild_id, {})
+
+    def is_ai_channel(self, guild_id: int, channel_id: int) -> bool:
+        channels = self._ai_channels.get(guild_id)
+        return channels is not None and channel_id in channels
+
+    def ai_channels(self, guild_id: int) -> Set[int]:
+        return self._ai_channels.get(guild_id, set())
+
+    async def update(self, guild_id: int, **changes):
+        """Merge changes into a guild's settings and persist them"""
+        settings = dict(self._settings.get(guild_id, {}))
+        settings.update(changes)
+        self._settings[guild_id] = settings
+        await self.database.set_guild_settings(str(guild_id), settings)
+
+    async def _set_ai_channels(self, guild_id: int, channels: Set[int]):
+        if channels:
+            self._ai_channels[guild_id] = channels
+        else:
+            self._ai_channels.pop(guild_id, None)
+        await self.update(guild_id, ai_channels=[str(cid) for cid in sorted(channels)])
+
+    async def add_ai_channel(self, guild_id: int, channel_id: int):
+        """Enable auto-response in a channel"""
+        await self._set_ai_channels(guild_id, self.ai_channels(guild_id) | {channel_id})
+
+    async def remove_ai_channel(self, guild_id: int, channel_id: int = None) -> bool:
+        """Disable auto-response in one channel, or all when none is given"""
+        channels = self.ai_channels(guild_id)
+        if not channels or (channel_id is not None and channel_id not in channels):
+            return False
+        await self._set_ai_channels(guild_id, set() if channel_id is None else channels - {channel_id})
+        return True
@@ -0,0 +1,74 @@
+import time
+from typing import Optional
+
+from aiohttp import web
+
+from utils.metrics import metrics
+
+class HealthServer:
+    """Health and metrics endpoints served on the bot's own event loop.
+
+    ``/healthz`` is liveness: it answers as long as the loop is turning.
+    ``/readyz`` is readiness: the gateway must be connected and the
+    upstream LLM healthy, otherwise it returns 503 with the failing checks.
+    """
+
+    def __init__(self, bot, host: str = "0.0.0.0", port: int = 10000, max_failure_streak: int = 5):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.max_failure_streak = max_failure_streak
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_get('/', self.home)
+        self.app.router.add_get('/healthz', self.liveness)
+        self.app.router.add_get('/readyz', self.readiness)
+        self.app.router.add_get('/metrics', self.prometheus)
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    async def start(self):
+        """Bind the server, a second call is a no-op"""
+        if self._runner is not None:
+            return
+        runner = web.AppRunner(self.app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+        self._runner = runner
+        print(f"🌐 Health server listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def checks(self):
+        """Readiness checks by name"""
+        ai_cog = self.bot.get_cog('AICommands')
+        return {
+            'gateway': self.bot.gateway_healthy(),
+            'upstream': ai_cog is not None and ai_cog.upstream_healthy(self.max_failure_streak)
+        }
+
+    async def home(self, request: web.Request) -> web.Response:
+        return web.Response(text="🤖 DigamberGPT - Operational")
+
+    async def liveness(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'alive', 'uptime': round(time.monotonic() - metrics.started)})
+
+    async def readiness(self, request: web.Request) -> web.Response:
+        checks = self.checks()
+        ready = all(checks.values())
+        return web.json_response(
+            {'status': 'ready' if ready else 'not_ready', 'checks': checks},
+            status=200 if ready else 503
+        )
+
+    async def prometheus(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=metrics.render(),
+            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        )
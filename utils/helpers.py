@@ -1,6 +1,9 @@
 import discord
 import asyncio
+import io
+import os
 import re
+import sys
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 import random
@@ -53,11 +56,13 @@ class Helpers:
             
         return embed
 
+    # Compiled once; group 1 is the link's host, after any "user:pass@"
+    LINK_PATTERN = re.compile(r'(?:https?://|www\.)(?:[^\s/?#<>@]*@)?([^\s/?#<>:@]+)', re.IGNORECASE)
+
     @staticmethod
     def contains_links(text: str) -> bool:
         """Check if text contains URLs"""
-        url_pattern = r'https?://\S+|www\.\S+'
-        return bool(re.search(url_pattern, text, re.IGNORECASE))
+        return Helpers.LINK_PATTERN.search(text) is not None
 
     @staticmethod
     def clean_content(text: str, max_length: int = 2000) -> str:
@@ -71,6 +76,76 @@ class Helpers:
             
         return text
 
+    # Boundaries to split long text on, best first
+    SPLIT_BOUNDARIES = ('\n```', '\n\n', '\n', '. ', ' ')
+    # Discord opens and closes code blocks on ``` anywhere in a line; a
+    # language tag only counts when the rest of that line is empty
+    FENCE_PATTERN = re.compile(r'```(?:([\w+#.-]+)(?=\n))?')
+
+    @staticmethod
+    def split_message(text: str, max_length: int = 2000) -> List[str]:
+        """Split text into Discord-sized chunks on markdown-safe boundaries.
+
+        Prefers code fences, then paragraphs, lines, sentences and words. A
+        code block cut in two, including one opened or closed mid-line, is
+        closed at the end of one chunk and reopened with its language at the
+        start of the next. Each cut lands in the
+        back half of the window, so the whole pass is linear in the text.
+        """
+        text = Helpers.clean_content(text, max_length=max(len(text), 1))
+        chunks = []
+        fence = None
+        pos = 0
+        while pos < len(text):
+            prefix = f"```{fence}\n" if fence is not None else ""
+            # Leave room for reopening and closing a code block
+            budget = max_length - len(prefix) - 4
+            if len(text) - pos <= budget:
+                end = len(text)
+            else:
+                end = pos + budget
+                for boundary in Helpers.SPLIT_BOUNDARIES:
+                    cut = text.rfind(boundary, pos + budget // 2, pos + budget)
+                    if cut != -1:
+                        end = cut + (1 if boundary == '. ' else 0)
+                        if boundary == '\n```':
+                            # A closing fence belongs with the block it closes
+                            inside = fence is not None
+                            for _ in Helpers.FENCE_PATTERN.finditer(text, pos, cut + 1):
+                                inside = not inside
+                            line_end = text.find('\n', cut + 1, pos + budget)
+                            if inside and line_end != -1:
+                                end = line_end
+                        break
+
+            piece = text[pos:end]
+            for match in Helpers.FENCE_PATTERN.finditer(piece):
+                fence = None if fence is not None else match.group(1) or ""
+
+            chunk = (prefix + piece).rstrip()
+            if fence is not None and end < len(text):
+                chunk += "\n```"
+            if chunk.strip():
+                chunks.append(chunk)
+            pos = end
+            while pos < len(text) and text[pos] in ' \n':
+                pos += 1
+        return chunks
+
+    @staticmethod
+    async def send_long(first_send, next_send, text: str, max_messages: int = 4, filename: str = "response.md"):
+        """Send text as ordered chunks, or as a file when it is very long"""
+        chunks = Helpers.split_message(text)
+        if len(chunks) > max_messages:
+            preview = Helpers.split_message(text, max_length=1500)[0]
+            file = discord.File(io.BytesIO(text.encode('utf-8')), filename=filename)
+            return [await first_send(f"{preview}\n\n📎 *Full response attached ({len(text):,} characters)*", file=file)]
+
+        sent = []
+        for i, chunk in enumerate(chunks):
+            sent.append(await (first_send if i == 0 else next_send)(chunk))
+        return sent
+
     @staticmethod
     def get_random_color() -> int:
         """Get a random discord color"""
@@ -110,5 +185,20 @@ class Helpers:
         else:
             return f"{minutes}m {seconds}s"
 
+    @staticmethod
+    def rss_bytes() -> int:
+        """Resident memory of this process (peak RSS where /proc is unavailable)"""
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            pass
+        try:
+            import resource
+        except ImportError:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
 # Helper instance
 helpers = Helpers()
@@ -0,0 +1,104 @@
+import base64
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import aiohttp
+
+# Called with a short stage name and the fraction done (0.0 - 1.0)
+ProgressCallback = Callable[[str, float], Awaitable[None]]
+
+class ImageError(Exception):
+    """Raised when an image backend fails to produce an image"""
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+class ImageBackend(ABC):
+    """Turns a prompt into PNG bytes.
+
+    ``identity`` goes into the cache key, so two backends (or two models
+    of one backend) never share cached images.
+    """
+    name = "base"
+
+    @property
+    def identity(self) -> str:
+        return self.name
+
+    @abstractmethod
+    async def generate(self, prompt: str, params: Dict[str, Any], progress: Optional[ProgressCallback] = None) -> bytes:
+        """PNG bytes for a prompt, reporting progress when the backend can"""
+
+    async def close(self):
+        pass
+
+class HTTPImageBackend(ImageBackend):
+    """OpenAI-compatible ``/images/generations`` endpoint over the bot's session"""
+    name = "http"
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        api_key: Optional[str],
+        model: str,
+        timeout: float = 120
+    ):
+        self.session = session
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+
+    @property
+    def identity(self) -> str:
+        return f"{self.name}:{self.model}"
+
+    async def generate(self, prompt: str, params: Dict[str, Any], progress: Optional[ProgressCallback] = None) -> bytes:
+        if progress:
+            await progress('generating', 0.0)
+        payload = dict(params, model=self.model, prompt=prompt, n=1, response_format='b64_json')
+        headers = {'Authorization': f"Bearer {self.api_key}"} if self.api_key else {}
+        try:
+            async with self.session.post(
+                f"{self.base_url}/images/generations",
+                json=payload,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as resp:
+                if resp.status >= 400:
+                    raise ImageError(f"Image API returned {resp.status}: {(await resp.text())[:200]}", status=resp.status)
+                data = await resp.json()
+        except aiohttp.ClientError as e:
+            raise ImageError(f"Connection error: {e}")
+        try:
+            return base64.b64decode(data['data'][0]['b64_json'])
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise ImageError("Image API returned no image")
+
+def image_backend_problem(settings: Dict[str, Any]) -> Optional[str]:
+    """Why image generation can't be offered with these settings, or None"""
+    if not settings.get('enabled', False):
+        return "disabled in ai_settings.image"
+    kind = settings.get('backend', 'http')
+    if kind != 'http':
+        return f"unknown backend {kind!r}"
+    api_key_env = settings.get('http', {}).get('api_key_env', "IMAGE_API_KEY")
+    if not os.getenv(api_key_env):
+        return f"{api_key_env} is not set"
+    return None
+
+def create_image_backend(settings: Dict[str, Any], session: Optional[aiohttp.ClientSession] = None) -> ImageBackend:
+    """Build the backend named by ``settings['backend']``"""
+    kind = settings.get('backend', 'http')
+    if kind == 'http':
+        http = settings.get('http', {})
+        return HTTPImageBackend(
+            session,
+            base_url=os.getenv("IMAGE_API_BASE_URL", http.get('base_url', "https://api.openai.com/v1")),
+            api_key=os.getenv(http.get('api_key_env', "IMAGE_API_KEY")),
+            model=http.get('model', "dall-e-3"),
+            timeout=settings.get('timeout', 120)
+        )
+    raise ValueError(f"Unknown image backend: {kind}")
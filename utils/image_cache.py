@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from utils.response_cache import ResponseCache
+
+class ImageCache:
+    """Content-addressed image files on disk, evicted LRU by total size.
+
+    Files are named by the SHA-256 of the backend, normalized prompt and
+    parameters, so a repeated request maps straight to an existing file.
+    The LRU order is kept in memory and rebuilt from modification times on
+    load; hits bump the mtime so the order survives restarts. Entries being
+    uploaded are pinned and never evicted until released.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 200 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    @staticmethod
+    def key(identity: str, prompt: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps([identity, ResponseCache.normalize(prompt), params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        # Two-character fan-out keeps directories small
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def load(self):
+        """Index files already on disk, least recently used first"""
+        found = []
+        if os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith('.png'):
+                        stat = os.stat(os.path.join(root, name))
+                        found.append((stat.st_mtime, name[:-4], stat.st_size))
+        self._sizes.clear()
+        self.total_bytes = 0
+        for _, key, size in sorted(found):
+            self._sizes[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def get(self, key: str, pin: bool = False) -> Optional[str]:
+        """Path of a cached image, or None; ``pin`` keeps it until ``release``"""
+        if key in self._sizes:
+            path = self.path_for(key)
+            try:
+                os.utime(path)
+            except OSError:
+                # Removed behind our back
+                self.total_bytes -= self._sizes.pop(key)
+            else:
+                self._sizes.move_to_end(key)
+                self.hits += 1
+                if pin:
+                    self.pin(key)
+                return path
+        self.misses += 1
+        return None
+
+    def pin(self, key: str):
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def release(self, key: str):
+        """Drop a pin taken by ``get`` or ``put``"""
+        remaining = self._pins.get(key, 0) - 1
+        if remaining > 0:
+            self._pins[key] = remaining
+        else:
+            self._pins.pop(key, None)
+            self._evict()
+
+    async def put(self, key: str, data: bytes, pin: bool = False) -> str:
+        """Store an image and return its path, evicting old ones past the size limit"""
+        path = self.path_for(key)
+        await asyncio.to_thread(self._write, path, data)
+        if key in self._sizes:
+            self.total_bytes -= self._sizes.pop(key)
+        self._sizes[key] = len(data)
+        self.total_bytes += len(data)
+        if pin:
+            self.pin(key)
+        self._evict()
+        return path
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _evict(self):
+        # The newest entry always stays, even if it alone is over the limit
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key in list(self._sizes):
+            if self.total_bytes <= self.max_bytes or len(self._sizes) <= 1:
+                break
+            if key in self._pins:
+                continue
+            self.total_bytes -= self._sizes.pop(key)
+            self.evictions += 1
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
@@ -0,0 +1,107 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from utils.image_backends import ImageBackend, ImageError, ProgressCallback
+from utils.image_cache import ImageCache
+from utils.metrics import metrics
+from utils.singleflight import SingleFlight
+
+class ImageQueueFull(Exception):
+    """Raised when too many image jobs are already waiting"""
+
+class ImageResult:
+    """A generated image, pinned in the cache until ``ImageJobQueue.release``"""
+    __slots__ = ('key', 'path', 'cached', 'seconds')
+
+    def __init__(self, key: str, path: str, cached: bool, seconds: float):
+        self.key = key
+        self.path = path
+        self.cached = cached
+        self.seconds = seconds
+
+class ImageJobQueue:
+    """Bounded async queue of image generations.
+
+    At most ``concurrency`` generations run at once and at most
+    ``max_pending`` more wait for a slot; past that, new requests are
+    refused instead of piling up. Cached images are returned without
+    queueing, and identical requests in flight share one generation.
+    """
+
+    def __init__(
+        self,
+        backend: ImageBackend,
+        cache: ImageCache,
+        concurrency: int = 2,
+        max_pending: int = 20,
+        timeout: float = 120
+    ):
+        self.backend = backend
+        self.cache = cache
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(concurrency)
+        self.inflight = SingleFlight()
+        self.running = 0
+        self.waiting = 0
+
+    async def generate(self, prompt: str, params: Dict[str, Any], progress: Optional[ProgressCallback] = None) -> ImageResult:
+        """Image for a prompt, pinned so eviction can't remove it mid-upload"""
+        started = time.perf_counter()
+        key = self.cache.key(self.backend.identity, prompt, params)
+        path = self.cache.get(key, pin=True)
+        if path is not None:
+            metrics.inc('bot_image_jobs_total', result='cached')
+            return ImageResult(key, path, True, time.perf_counter() - started)
+
+        future = self.inflight.pending(key)
+        if future is not None:
+            metrics.inc('bot_image_jobs_total', result='coalesced')
+            if progress:
+                await progress('waiting for an identical request', 0.0)
+            await asyncio.shield(future)
+            # The leader's file may already be evicted; then generate it again
+            path = self.cache.get(key, pin=True)
+            if path is not None:
+                return ImageResult(key, path, False, time.perf_counter() - started)
+
+        if self.waiting >= self.max_pending:
+            metrics.inc('bot_image_jobs_total', result='rejected')
+            raise ImageQueueFull(f"{self.waiting} image jobs already waiting")
+
+        try:
+            path = await self.inflight.do(key, lambda: self._run(key, prompt, params, progress))
+        except Exception as e:
+            metrics.inc('bot_image_jobs_total', result='error')
+            metrics.inc('bot_errors_total', where='image', type=type(e).__name__)
+            raise
+        metrics.inc('bot_image_jobs_total', result='generated')
+        return ImageResult(key, path, False, time.perf_counter() - started)
+
+    def release(self, result: ImageResult):
+        """Unpin an image once it has been uploaded"""
+        self.cache.release(result.key)
+
+    async def _run(self, key: str, prompt: str, params: Dict[str, Any], progress: Optional[ProgressCallback]) -> str:
+        self.waiting += 1
+        try:
+            if progress and self.running >= self.concurrency:
+                await progress(f"queued, {self.waiting} waiting", 0.0)
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            started = time.perf_counter()
+            try:
+                data = await asyncio.wait_for(self.backend.generate(prompt, params, progress), self.timeout)
+            except asyncio.TimeoutError:
+                raise ImageError(f"Image generation timed out after {self.timeout:.0f}s")
+            metrics.observe('bot_image_generation_seconds', time.perf_counter() - started)
+            return await self.cache.put(key, data, pin=True)
+        finally:
+            self.running -= 1
+            self._slots.release()
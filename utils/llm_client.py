@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterator, List, Optional
+
+import aiohttp
+
+from utils.metrics import metrics
+
+class LLMError(Exception):
+    """Raised when the upstream LLM request fails"""
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class LLMClient:
+    """Async client for Groq's OpenAI-compatible chat completions API.
+
+    Requests go through the bot's shared aiohttp session. When no session is
+    available the blocking Groq SDK is run in a bounded thread pool instead,
+    so the event loop is never blocked either way.
+    """
+
+    DEFAULT_BASE_URL = "https://api.groq.com/openai/v1"
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        session: Optional[aiohttp.ClientSession] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 30.0,
+        max_concurrency: int = 16,
+        executor_workers: int = 4
+    ):
+        self.api_key = api_key
+        self.session = session
+        self.base_url = (base_url or os.getenv("LLM_BASE_URL") or self.DEFAULT_BASE_URL).rstrip('/')
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.executor_workers = executor_workers
+        self._executor = None
+        self._sdk = None
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    @staticmethod
+    def _retry_after(headers) -> Optional[float]:
+        value = headers.get("retry-after")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _record_usage(model: str, usage: Optional[Dict[str, Any]]):
+        if not usage:
+            return
+        metrics.inc('bot_llm_tokens_total', usage.get('prompt_tokens', 0), model=model, kind='prompt')
+        metrics.inc('bot_llm_tokens_total', usage.get('completion_tokens', 0), model=model, kind='completion')
+
+    async def _raise_for_status(self, resp: aiohttp.ClientResponse):
+        """Turn an HTTP error response into an LLMError"""
+        if resp.status < 400:
+            return
+        try:
+            body = await resp.json(content_type=None)
+            detail = body.get('error', {}).get('message', '')
+        except (aiohttp.ContentTypeError, json.JSONDecodeError, AttributeError):
+            detail = await resp.text()
+
+        if resp.status == 401:
+            message = f"Authentication failed: {detail}"
+        elif resp.status == 429:
+            message = f"Rate limit reached: {detail}"
+        else:
+            message = f"HTTP {resp.status}: {detail}"
+        raise LLMError(message, status=resp.status, retry_after=self._retry_after(resp.headers))
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        timeout: Optional[float] = None
+    ) -> str:
+        """Run a chat completion and return the reply text"""
+        async with self.semaphore:
+            try:
+                if self.session and not self.session.closed:
+                    return await self._chat_http(messages, model, temperature, max_tokens, timeout or self.timeout)
+                return await self._chat_executor(messages, model, temperature, max_tokens, timeout or self.timeout)
+            except asyncio.TimeoutError:
+                raise LLMError(f"Request timed out after {timeout or self.timeout:.0f}s")
+            except aiohttp.ClientError as e:
+                raise LLMError(f"Connection error: {e}")
+
+    async def _chat_http(self, messages, model, temperature, max_tokens, timeout) -> str:
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        async with self.session.post(
+            f"{self.base_url}/chat/completions",
+            json=payload,
+            headers=self._headers(),
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as resp:
+            await self._raise_for_status(resp)
+            data = await resp.json()
+        self._record_usage(model, data.get('usage'))
+        return data['choices'][0]['message']['content']
+
+    async def _chat_executor(self, messages, model, temperature, max_tokens, timeout) -> str:
+        """Fallback: run the blocking SDK call in a bounded thread pool"""
+        # The SDK is slow to import and only needed without a session
+        from groq import Groq, APIStatusError
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix="llm")
+            self._sdk = Groq(api_key=self.api_key, timeout=timeout)
+
+        loop = asyncio.get_running_loop()
+        call = lambda: self._sdk.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        try:
+            response = await asyncio.wait_for(loop.run_in_executor(self._executor, call), timeout)
+        except APIStatusError as e:
+            raise LLMError(str(e), status=e.status_code, retry_after=self._retry_after(e.response.headers))
+        if response.usage:
+            self._record_usage(model, response.usage.model_dump())
+        return response.choices[0].message.content
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Run a chat completion and yield the reply as it is generated"""
+        timeout = timeout or self.timeout
+        if not self.session or self.session.closed:
+            # The SDK fallback has no async stream, deliver the reply in one piece
+            yield await self.chat(messages, model, temperature, max_tokens, timeout)
+            return
+
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        async with self.semaphore:
+            try:
+                async with self.session.post(
+                    f"{self.base_url}/chat/completions",
+                    json=payload,
+                    headers=self._headers(),
+                    # Bound the gap between chunks rather than the whole stream
+                    timeout=aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+                ) as resp:
+                    await self._raise_for_status(resp)
+                    async for raw in resp.content:
+                        line = raw.decode('utf-8').strip()
+                        if not line.startswith('data:'):
+                            continue
+                        data = line[5:].strip()
+                        if data == '[DONE]':
+                            break
+                        chunk = json.loads(data)
+                        # Groq reports usage on the last chunk
+                        self._record_usage(model, chunk.get('usage') or chunk.get('x_groq', {}).get('usage'))
+                        if not chunk.get('choices'):
+                            continue
+                        delta = chunk['choices'][0].get('delta', {})
+                        if delta.get('content'):
+                            yield delta['content']
+            except asyncio.TimeoutError:
+                raise LLMError(f"Stream stalled for more than {timeout:.0f}s")
+            except aiohttp.ClientError as e:
+                raise LLMError(f"Connection error: {e}")
+
+    def close(self):
+        """Release the fallback thread pool"""
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,87 @@
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, List, Tuple
+
+class Conversation:
+    """Chat turns for one user or channel"""
+    __slots__ = ('turns', 'tokens', 'last_active')
+
+    def __init__(self):
+        self.turns: Deque[Tuple[str, str, int]] = deque()
+        self.tokens = 0
+        self.last_active = time.monotonic()
+
+class ConversationStore:
+    """Bounded conversation memory.
+
+    Conversations are kept in least-recently-used order, so evicting the
+    coldest one and expiring idle ones both happen from the front of the
+    dict without scanning.
+    """
+
+    def __init__(self, max_conversations: int = 5000, max_tokens: int = 2000, idle_ttl: float = 1800):
+        self.max_conversations = max_conversations
+        self.max_tokens = max_tokens
+        self.idle_ttl = idle_ttl
+        self._conversations: "OrderedDict[Hashable, Conversation]" = OrderedDict()
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count, about four characters per token"""
+        return len(text) // 4 + 1
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._conversations
+
+    def prune(self):
+        """Drop conversations that have been idle longer than the TTL"""
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._conversations:
+            key, conversation = next(iter(self._conversations.items()))
+            if conversation.last_active >= cutoff:
+                break
+            del self._conversations[key]
+
+    def history(self, key: Hashable) -> List[Dict[str, Any]]:
+        """Get the stored turns as chat messages"""
+        self.prune()
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            return []
+        return [{"role": role, "content": content} for role, content, _ in conversation.turns]
+
+    def append(self, key: Hashable, role: str, content: str):
+        """Add a turn, trimming the oldest ones to stay within budget"""
+        self.prune()
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            conversation = self._conversations[key] = Conversation()
+            if len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+        else:
+            self._conversations.move_to_end(key)
+
+        tokens = self.estimate_tokens(content)
+        conversation.turns.append((role, content, tokens))
+        conversation.tokens += tokens
+        conversation.last_active = time.monotonic()
+
+        while conversation.tokens > self.max_tokens and conversation.turns:
+            _, _, dropped = conversation.turns.popleft()
+            conversation.tokens -= dropped
+        # Never start the history with a dangling assistant reply
+        while conversation.turns and conversation.turns[0][0] != 'user':
+            _, _, dropped = conversation.turns.popleft()
+            conversation.tokens -= dropped
+
+    def add_exchange(self, key: Hashable, user_input: str, reply: str):
+        """Record a user message and the model's reply"""
+        self.append(key, 'user', user_input)
+        self.append(key, 'assistant', reply)
+
+    def clear(self, key: Hashable) -> bool:
+        """Forget a conversation, returns whether one existed"""
+        return self._conversations.pop(key, None) is not None
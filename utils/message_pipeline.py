@@ -0,0 +1,75 @@
+import re
+from collections import Counter
+
+import discord
+
+from utils.metrics import metrics
+
+# Actions a message can be routed to
+COMMANDS = 'commands'
+CHAT = 'chat'
+IMAGE = 'image'
+TOO_LONG = 'too_long'
+DROP = 'drop'
+
+class MessagePipeline:
+    """Staged pre-filter run on every message before any AI work.
+
+    Stages are ordered cheapest first, and each one either routes the
+    message or passes it on. Per-stage counters show where traffic stops,
+    i.e. how many upstream calls were avoided.
+    """
+
+    # One compiled alternation scans the text once for every keyword
+    IMAGE_INTENT = re.compile(
+        r"\b(?:generate\s+(?:an?\s+)?image|create\s+(?:an?\s+)?image|image|picture|photo|draw)\b",
+        re.IGNORECASE
+    )
+
+    def __init__(self, bot, prefix: str = "!", max_prompt_chars: int = 4000):
+        self.bot = bot
+        self.prefix = prefix
+        self.max_prompt_chars = max_prompt_chars
+        self.counters = Counter()
+
+    async def classify(self, message: discord.Message) -> str:
+        """Route a message, counting the stage that decided it"""
+        action, stage = await self._classify(message)
+        self.counters['received'] += 1
+        self.counters[stage] += 1
+        metrics.inc('bot_pipeline_messages_total', stage=stage)
+        return action
+
+    async def _classify(self, message: discord.Message):
+        if message.author.bot:
+            return DROP, 'bot'
+        # DMs and non-AI channels only ever run prefix commands
+        if message.guild is None:
+            return COMMANDS, 'dm'
+        # Moderation covers every guild channel, not only AI ones
+        automod = getattr(self.bot, 'automod', None)
+        if automod is not None and automod.check(message):
+            return DROP, 'automod'
+        if not self.bot.guild_settings.is_ai_channel(message.guild.id, message.channel.id):
+            return COMMANDS, 'not_ai_channel'
+
+        content = message.content.strip()
+        if content.startswith(self.prefix):
+            return COMMANDS, 'command'
+        if not content:
+            return DROP, 'empty'
+        if len(content) > self.max_prompt_chars:
+            return TOO_LONG, 'too_long'
+
+        # Follow-ups join the user's open batch, which was already admitted
+        batcher = getattr(self.bot, 'batcher', None)
+        if batcher and batcher.is_open(message.channel.id, message.author.id):
+            return CHAT, 'batched'
+
+        # Drop spam before it costs any upstream quota
+        if await self.bot.cooldowns.check(message.author.id, message.channel.id, message.guild.id) > 0:
+            return DROP, 'cooldown'
+
+        if self.IMAGE_INTENT.search(content):
+            return IMAGE, 'image'
+        return CHAT, 'chat'
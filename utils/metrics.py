@@ -0,0 +1,174 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Seconds, tuned for Discord/LLM latencies rather than web requests
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+class Metrics:
+    """Process-wide counters, histograms and gauges.
+
+    Hot paths call ``inc``/``observe``; gauges are callbacks evaluated only
+    when the registry is rendered. ``render`` produces the Prometheus text
+    exposition format and is safe to call from the web server's thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._gauges: Dict[str, Callable[[], Union[float, Dict[Labels, float]]]] = {}
+        self.started = time.monotonic()
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def gauge(self, name: str, func: Callable[[], Union[float, Dict[Labels, float]]], help_text: str = ""):
+        """Register a gauge read from ``func`` at render time"""
+        self._gauges[name] = func
+        self.describe(name, 'gauge', help_text)
+
+    def counter_total(self, name: str, **labels) -> float:
+        """Sum of a counter across every series matching ``labels``"""
+        wanted = set(self._labels(labels))
+        with self._lock:
+            return sum(v for k, v in self._counters.get(name, {}).items() if wanted <= set(k))
+
+    def counter_series(self, name: str) -> Dict[Labels, float]:
+        with self._lock:
+            return dict(self._counters.get(name, {}))
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        """Merge every series matching ``labels`` into one histogram"""
+        wanted = set(self._labels(labels))
+        merged = Histogram()
+        with self._lock:
+            for key, histogram in self._histograms.get(name, {}).items():
+                if not wanted <= set(key):
+                    continue
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.sum += histogram.sum
+                merged.count += histogram.count
+        return merged
+
+    @staticmethod
+    def _format(name: str, labels: Labels, value: float, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(labels) + ([extra] if extra else [])
+        if pairs:
+            body = ",".join(f'{k}="{v}"' for k, v in pairs)
+            return f"{name}{{{body}}} {value}"
+        return f"{name} {value}"
+
+    def _header(self, lines: List[str], name: str, kind: str):
+        described_kind, help_text = self._help.get(name, (kind, ""))
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {described_kind}")
+
+    def render(self) -> str:
+        """Everything in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {k: (h.buckets, list(h.counts), h.sum, h.count) for k, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+
+        for name, series in sorted(counters.items()):
+            self._header(lines, name, 'counter')
+            for labels, value in sorted(series.items()):
+                lines.append(self._format(name, labels, value))
+
+        for name, series in sorted(histograms.items()):
+            self._header(lines, name, 'histogram')
+            for labels, (buckets, counts, total, count) in sorted(series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(self._format(f"{name}_bucket", labels, cumulative, ('le', str(bound))))
+                lines.append(self._format(f"{name}_bucket", labels, count, ('le', '+Inf')))
+                lines.append(self._format(f"{name}_sum", labels, total))
+                lines.append(self._format(f"{name}_count", labels, count))
+
+        for name, func in sorted(self._gauges.items()):
+            try:
+                value = func()
+            except Exception:
+                # A gauge must never break the whole scrape
+                continue
+            self._header(lines, name, 'gauge')
+            if isinstance(value, dict):
+                for labels, sample in sorted(value.items()):
+                    lines.append(self._format(name, labels, sample))
+            else:
+                lines.append(self._format(name, (), value))
+
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.describe('bot_gateway_events_total', 'counter', "Gateway events received, by event type")
+metrics.describe('bot_pipeline_messages_total', 'counter', "Messages by the pipeline stage that routed them")
+metrics.describe('bot_errors_total', 'counter', "Errors, by where they happened and exception type")
+metrics.describe('bot_llm_tokens_total', 'counter', "Tokens reported by the LLM API")
+metrics.describe('bot_llm_requests_total', 'counter', "Upstream LLM requests, by model and outcome")
+metrics.describe('bot_shared_cache_hits_total', 'counter', "Replies found in the shared cache after a local miss")
+metrics.describe('bot_queue_shed_total', 'counter', "AI jobs dropped because the queue was full")
+metrics.describe('bot_automod_actions_total', 'counter', "Messages removed by auto-moderation, by rule")
+metrics.describe('bot_image_jobs_total', 'counter', "Image requests, by how they were answered")
+metrics.describe('bot_image_generation_seconds', 'histogram', "Time image backends take to produce an image")
+metrics.describe('bot_queue_wait_seconds', 'histogram', "Time AI jobs spend queued before a worker picks them up")
+metrics.describe('bot_llm_queue_wait_seconds', 'histogram', "Time requests wait for the upstream rate limiter")
+metrics.describe('bot_llm_ttft_seconds', 'histogram', "Time from sending a streamed request to its first token")
+metrics.describe('bot_reply_ttft_seconds', 'histogram', "Time from starting a streamed reply to posting it in Discord")
+metrics.describe('bot_llm_request_seconds', 'histogram', "Total upstream request time")
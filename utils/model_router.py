@@ -0,0 +1,86 @@
+import re
+from typing import Any, Dict, List, Optional
+
+class ModelRouter:
+    """Pick a model per request from ai_settings.
+
+    Short chat goes to the fast model; long prompts, code, explicit
+    commands and "think harder" requests go to the large one. The other
+    model is always returned as the fallback. Latency is tracked per model
+    as an exponentially weighted moving average, and a model that keeps
+    blowing the latency budget is demoted behind its fallback.
+    """
+
+    COMPLEX_HINTS = re.compile(
+        r"```|\b(explain|analy[sz]e|compare|step by step|write|code|debug|essay|summari[sz]e|translate|prove)\b",
+        re.IGNORECASE
+    )
+
+    def __init__(
+        self,
+        large_model: str,
+        fast_model: str,
+        long_prompt_chars: int = 400,
+        commands_use_large: bool = True,
+        latency_budget: Optional[float] = None,
+        smoothing: float = 0.2
+    ):
+        self.large_model = large_model
+        self.fast_model = fast_model
+        self.long_prompt_chars = long_prompt_chars
+        self.commands_use_large = commands_use_large
+        self.latency_budget = latency_budget
+        self.smoothing = smoothing
+        self.latency: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+        self.failure_streak: Dict[str, int] = {}
+
+    @classmethod
+    def from_settings(cls, ai_settings: Dict[str, Any]) -> "ModelRouter":
+        routing = ai_settings.get('routing', {})
+        return cls(
+            large_model=ai_settings.get('model', 'llama-3.3-70b-versatile'),
+            fast_model=ai_settings.get('fast_model', 'llama-3.1-8b-instant'),
+            long_prompt_chars=routing.get('long_prompt_chars', 400),
+            commands_use_large=routing.get('commands_use_large', True),
+            latency_budget=routing.get('latency_budget')
+        )
+
+    def is_complex(self, prompt: str) -> bool:
+        return len(prompt) >= self.long_prompt_chars or bool(self.COMPLEX_HINTS.search(prompt))
+
+    def route(self, prompt: str, command: bool = False) -> List[str]:
+        """Models to try for a prompt, in order"""
+        if (command and self.commands_use_large) or self.is_complex(prompt):
+            models = [self.large_model, self.fast_model]
+        else:
+            models = [self.fast_model, self.large_model]
+
+        if self.latency_budget is not None:
+            primary, fallback = models
+            if self.latency.get(primary, 0.0) > self.latency_budget and \
+                    self.latency.get(fallback, 0.0) < self.latency.get(primary, 0.0):
+                models = [fallback, primary]
+
+        if models[0] == models[1]:
+            return models[:1]
+        return models
+
+    def healthy(self, max_failure_streak: int = 5) -> bool:
+        """True while at least one model is not failing every call"""
+        return any(
+            self.failure_streak.get(model, 0) < max_failure_streak
+            for model in (self.large_model, self.fast_model)
+        )
+
+    def record(self, model: str, seconds: float, ok: bool = True):
+        """Fold one call's latency into the model's moving average"""
+        self.calls[model] = self.calls.get(model, 0) + 1
+        if not ok:
+            self.failures[model] = self.failures.get(model, 0) + 1
+            self.failure_streak[model] = self.failure_streak.get(model, 0) + 1
+            return
+        self.failure_streak[model] = 0
+        previous = self.latency.get(model)
+        self.latency[model] = seconds if previous is None else previous + self.smoothing * (seconds - previous)
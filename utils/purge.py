@@ -0,0 +1,167 @@
+import asyncio
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional, Set
+
+import discord
+
+from utils.helpers import Helpers
+
+# Discord rejects bulk deletes of messages older than this
+BULK_DELETE_MAX_AGE = timedelta(days=14)
+
+class PurgeFilter:
+    """Which messages a purge removes; every given condition must match"""
+
+    def __init__(
+        self,
+        author_ids: Optional[Set[int]] = None,
+        pattern: Optional[str] = None,
+        links: bool = False,
+        bots: bool = False,
+        after: Optional[datetime] = None
+    ):
+        self.author_ids = author_ids
+        self.pattern = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self.links = links
+        self.bots = bots
+        self.after = after
+
+    def matches(self, message: discord.Message) -> bool:
+        if message.pinned:
+            return False
+        if self.author_ids and message.author.id not in self.author_ids:
+            return False
+        if self.bots and not message.author.bot:
+            return False
+        if self.links and not Helpers.contains_links(message.content):
+            return False
+        if self.pattern is not None and not self.pattern.search(message.content):
+            return False
+        return True
+
+class PurgeProgress:
+    """Running totals of one purge"""
+    __slots__ = ('scanned', 'matched', 'bulk_deleted', 'single_deleted', 'failed', 'done')
+
+    def __init__(self):
+        self.scanned = 0
+        self.matched = 0
+        self.bulk_deleted = 0
+        self.single_deleted = 0
+        self.failed = 0
+        self.done = False
+
+    @property
+    def deleted(self) -> int:
+        return self.bulk_deleted + self.single_deleted
+
+class PurgeEngine:
+    """Streams a channel's history and deletes what a PurgeFilter matches.
+
+    History is fetched lazily, newest first, one page of 100 at a time, so
+    memory stays flat however far back the purge goes. Recent matches are
+    removed 100 at a time through bulk delete; once history crosses the
+    14-day limit, the rest go one by one, spaced by ``single_delete_interval``.
+    """
+
+    def __init__(
+        self,
+        channel,
+        purge_filter: PurgeFilter,
+        limit: int,
+        scan_limit: int,
+        before: Optional[discord.abc.Snowflake] = None,
+        extra: Optional[List[discord.Message]] = None,
+        single_delete_interval: float = 1.0,
+        progress_interval: float = 2.0,
+        on_progress: Optional[Callable[[PurgeProgress], Awaitable[None]]] = None
+    ):
+        self.channel = channel
+        self.filter = purge_filter
+        self.limit = limit
+        self.scan_limit = scan_limit
+        self.before = before
+        # Deleted alongside the matches without counting towards them (the
+        # invoking command message)
+        self.extra = list(extra or [])
+        self.single_delete_interval = single_delete_interval
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+        self.progress = PurgeProgress()
+        self._last_report = 0.0
+
+    async def run(self) -> PurgeProgress:
+        progress = self.progress
+        batch: List[discord.Message] = list(self.extra)
+        bulk_cutoff = datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE + timedelta(minutes=1)
+
+        async for message in self.channel.history(
+            limit=self.scan_limit, before=self.before, after=self.filter.after, oldest_first=False
+        ):
+            progress.scanned += 1
+            if self.filter.matches(message):
+                progress.matched += 1
+                if message.created_at > bulk_cutoff:
+                    batch.append(message)
+                    if len(batch) >= 100:
+                        await self._bulk_delete(batch)
+                        batch = []
+                else:
+                    # Newest first, so everything from here on is too old for bulk delete
+                    if batch:
+                        await self._bulk_delete(batch)
+                        batch = []
+                    await self._single_delete(message)
+                if progress.matched >= self.limit:
+                    break
+            await self._report()
+
+        if batch:
+            await self._bulk_delete(batch)
+        progress.done = True
+        await self._report(force=True)
+        return progress
+
+    async def _bulk_delete(self, messages: List[discord.Message]):
+        counted = [m for m in messages if m not in self.extra]
+        try:
+            # delete_messages falls back to a single delete for one message
+            await self.channel.delete_messages(messages, reason="Purge")
+            self.progress.bulk_deleted += len(counted)
+        except discord.NotFound:
+            # Only raised for a lone message someone already removed
+            pass
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            self.progress.failed += len(counted)
+            print(f"❌ Bulk delete failed in {self.channel.id}: {e}")
+        self.extra = []
+
+    async def _single_delete(self, message: discord.Message):
+        try:
+            await message.delete()
+            self.progress.single_deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            self.progress.failed += 1
+            print(f"❌ Delete failed for message {message.id}: {e}")
+        # Single deletes share a tight per-channel bucket; pace them
+        await asyncio.sleep(self.single_delete_interval)
+        await self._report()
+
+    async def _report(self, force: bool = False):
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_report >= self.progress_interval:
+            self._last_report = now
+            try:
+                await self.on_progress(self.progress)
+            except discord.HTTPException:
+                pass
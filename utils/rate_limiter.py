@@ -0,0 +1,166 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.llm_client import LLMError
+from utils.metrics import metrics
+
+PRIORITY_COMMAND = 0
+PRIORITY_AUTO = 1
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at a per-minute rate"""
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+class UpstreamScheduler:
+    """Client-side admission control for upstream LLM calls.
+
+    Work waits in a priority queue until both the requests-per-minute and
+    tokens-per-minute buckets can cover it. A 429 pauses the whole queue
+    for the server's retry-after (or an exponential backoff) plus jitter,
+    then the call is retried rather than failed.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 30,
+        tokens_per_minute: float = 6000,
+        max_retries: int = 3,
+        base_backoff: float = 1.0,
+        name: str = 'default'
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self._queue = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._blocked_until = 0.0
+        self.wait_times = deque(maxlen=1000)
+        self.rate_limited = 0
+        self.retries = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth and recent wait times"""
+        waits = sorted(self.wait_times)
+        return {
+            'queue_depth': self.queue_depth,
+            'avg_wait': sum(waits) / len(waits) if waits else 0.0,
+            'p95_wait': waits[int(len(waits) * 0.95)] if waits else 0.0,
+            'rate_limited': self.rate_limited,
+            'retries': self.retries
+        }
+
+    async def acquire(self, priority: int = PRIORITY_AUTO, tokens: int = 0):
+        """Wait for a slot in priority order"""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), tokens, future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._wakeup.set()
+
+        started = time.monotonic()
+        await future
+        waited = time.monotonic() - started
+        self.wait_times.append(waited)
+        metrics.observe('bot_llm_queue_wait_seconds', waited, model=self.name)
+
+    async def _dispatch(self):
+        while self._queue:
+            priority, seq, tokens, future = self._queue[0]
+            if future.done():
+                # Waiter was cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+
+            delay = max(
+                self._blocked_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(tokens)
+            )
+            if delay > 0:
+                # Sleep, but re-check early if higher-priority work arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._queue)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            future.set_result(None)
+
+    async def backoff(self, error: LLMError, attempt: int):
+        """Pause the queue after a 429 and wait before retrying"""
+        self.rate_limited += 1
+        delay = error.retry_after if error.retry_after is not None else self.base_backoff * (2 ** attempt)
+        delay *= random.uniform(1.0, 1.25)
+        self._pause(delay)
+        self.retries += 1
+        await asyncio.sleep(delay)
+
+    def _pause(self, delay: float):
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    def rate_limited_by(self, error: LLMError):
+        """Record a 429 that won't be retried here, pausing everything queued behind it"""
+        if error.status == 429:
+            self.rate_limited += 1
+            self._pause(error.retry_after or self.base_backoff)
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        return isinstance(error, LLMError) and error.status == 429 and attempt < self.max_retries
+
+    async def run(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_AUTO,
+        tokens: int = 0,
+        retry: bool = True
+    ) -> Any:
+        """Run an upstream call under the budgets, retrying rate limits"""
+        attempt = 0
+        while True:
+            await self.acquire(priority, tokens)
+            try:
+                return await func()
+            except LLMError as e:
+                if not retry or not self.should_retry(e, attempt):
+                    self.rate_limited_by(e)
+                    raise
+                await self.backoff(e, attempt)
+                attempt += 1
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+class ResponseCache:
+    """LRU + TTL cache of model replies.
+
+    Entries are keyed on the normalized prompt plus a context digest that
+    covers the model, temperature, system prompt and conversation history.
+    With ``near_duplicate`` enabled, a miss falls back to the closest cached
+    prompt in the same context whose word-set Jaccard similarity reaches the
+    threshold.
+    """
+
+    _WORD = re.compile(r"\w+")
+    _SPACE = re.compile(r"\s+")
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: float = 3600,
+        persist_path: Optional[str] = None,
+        near_duplicate: bool = False,
+        similarity: float = 0.9
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self.near_duplicate = near_duplicate
+        self.similarity = similarity
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._postings: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def normalize(cls, prompt: str) -> str:
+        """Lowercase, collapse whitespace and drop trailing punctuation"""
+        return cls._SPACE.sub(' ', prompt.lower()).strip().rstrip('?!. ')
+
+    @staticmethod
+    def context_key(model: str, temperature: float, messages: List[Dict[str, str]]) -> str:
+        """Digest of everything besides the prompt that shapes the reply"""
+        payload = json.dumps([model, temperature, messages], ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _key(context: str, normalized: str) -> str:
+        return hashlib.sha256(f"{context}\0{normalized}".encode('utf-8')).hexdigest()
+
+    def key(self, context: str, prompt: str) -> str:
+        """Exact-match key for a prompt in a context"""
+        return self._key(context, self.normalize(prompt))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.near_hits + self.misses
+        return (self.hits + self.near_hits) / total if total else 0.0
+
+    def get(self, context: str, prompt: str) -> Optional[str]:
+        """Look up a cached reply"""
+        normalized = self.normalize(prompt)
+        key = self._key(context, normalized)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry['expires'] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['value']
+            self._remove(key)
+
+        if self.near_duplicate:
+            key = self._find_similar(context, normalized)
+            if key is not None:
+                self._entries.move_to_end(key)
+                self.near_hits += 1
+                return self._entries[key]['value']
+
+        self.misses += 1
+        return None
+
+    def set(self, context: str, prompt: str, value: str, expires: Optional[float] = None):
+        """Store a reply, evicting the least recently used entry when full"""
+        normalized = self.normalize(prompt)
+        key = self._key(context, normalized)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = {
+            'value': value,
+            'expires': expires or time.time() + self.ttl,
+            'context': context,
+            'prompt': normalized
+        }
+        if self.near_duplicate:
+            for word in self._words(normalized):
+                self._postings.setdefault(word, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None or not self.near_duplicate:
+            return
+        for word in self._words(entry['prompt']):
+            keys = self._postings.get(word)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[word]
+
+    def _words(self, normalized: str) -> Set[str]:
+        return set(self._WORD.findall(normalized))
+
+    def _find_similar(self, context: str, normalized: str) -> Optional[str]:
+        """Best Jaccard match in the same context, using prefix filtering"""
+        words = sorted(self._words(normalized))
+        if not words:
+            return None
+        # Any set with Jaccard >= t must share one of the first n - ceil(t*n) + 1 words
+        prefix = len(words) - math.ceil(self.similarity * len(words)) + 1
+        candidates = set()
+        for word in words[:prefix]:
+            candidates.update(self._postings.get(word, ()))
+
+        query = set(words)
+        best, best_score = None, self.similarity
+        now = time.time()
+        for key in candidates:
+            entry = self._entries[key]
+            if entry['context'] != context or entry['expires'] <= now:
+                continue
+            other = self._words(entry['prompt'])
+            score = len(query & other) / len(query | other)
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    def load(self):
+        """Load persisted entries, skipping expired ones"""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not load response cache: {e}")
+            return
+
+        now = time.time()
+        for entry in entries:
+            if entry['expires'] > now:
+                self.set(entry['context'], entry['prompt'], entry['value'], expires=entry['expires'])
+
+    def save(self):
+        """Write live entries to disk, oldest first so LRU order survives"""
+        if not self.persist_path:
+            return
+        now = time.time()
+        entries = [e for e in self._entries.values() if e['expires'] > now]
+        os.makedirs(os.path.dirname(self.persist_path) or '.', exist_ok=True)
+        tmp_path = self.persist_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.persist_path)
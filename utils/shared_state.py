@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from utils.cooldowns import SlidingWindowLimiter
+
+class MemoryBackend:
+    """Shared-state backend for a single process: plain in-process dicts"""
+
+    shared = False
+
+    def __init__(self):
+        self._values: Dict[Tuple[str, str], Tuple[Any, Optional[float]]] = {}
+        self._limiters: Dict[Tuple[str, int, float], SlidingWindowLimiter] = {}
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        item = self._values.get((namespace, key))
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires <= time.time():
+            del self._values[(namespace, key)]
+            return None
+        return value
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        self._values[(namespace, key)] = (value, time.time() + ttl if ttl else None)
+
+    async def delete(self, namespace: str, key: str):
+        self._values.pop((namespace, key), None)
+
+    async def acquire(self, namespace: str, key: str, rate: int, per: float) -> float:
+        """Record an action if the key is under its limit, otherwise return seconds to wait"""
+        limiter = self._limiters.get((namespace, rate, per))
+        if limiter is None:
+            limiter = self._limiters[(namespace, rate, per)] = SlidingWindowLimiter(rate, per)
+        wait = limiter.retry_after(key)
+        if wait == 0:
+            limiter.hit(key)
+        return wait
+
+    async def prune(self):
+        now = time.time()
+        for item_key in [k for k, (_, expires) in self._values.items() if expires is not None and expires <= now]:
+            del self._values[item_key]
+
+    async def close(self):
+        pass
+
+class SQLiteBackend:
+    """Shared-state backend several bot processes can use at once.
+
+    A separate SQLite file in WAL mode, accessed from one worker thread
+    per process like the main database. Rate-limit windows are updated
+    inside an immediate transaction, so concurrent processes never both
+    take the last slot. Timestamps are wall-clock, since monotonic clocks
+    are not comparable across processes.
+    """
+
+    shared = True
+
+    def __init__(self, path: str = "data/shared_state.db"):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-state")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS state (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires REAL,
+                    PRIMARY KEY (namespace, key)
+                );
+                CREATE TABLE IF NOT EXISTS windows (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    window_start REAL NOT NULL,
+                    previous INTEGER NOT NULL,
+                    current INTEGER NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                );
+            """)
+            self._conn = conn
+        return self._conn
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        def read():
+            row = self._connection().execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ? AND (expires IS NULL OR expires > ?)",
+                (namespace, key, time.time())
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        return await self._run(read)
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        def write():
+            self._connection().execute(
+                "INSERT OR REPLACE INTO state (namespace, key, value, expires) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, ensure_ascii=False), time.time() + ttl if ttl else None)
+            )
+        await self._run(write)
+
+    async def delete(self, namespace: str, key: str):
+        def write():
+            self._connection().execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+        await self._run(write)
+
+    async def acquire(self, namespace: str, key: str, rate: int, per: float) -> float:
+        """Same two-window estimate as SlidingWindowLimiter, checked and recorded atomically"""
+        def update():
+            conn = self._connection()
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT window_start, previous, current FROM windows WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+                start, previous, current = row if row else (now, 0, 0)
+                elapsed = now - start
+                if elapsed >= 2 * per:
+                    start, previous, current = now, 0, 0
+                elif elapsed >= per:
+                    start, previous, current = start + per, current, 0
+
+                estimate = previous * (1 - (now - start) / per) + current
+                if estimate < rate:
+                    wait = 0.0
+                    current += 1
+                elif current >= rate:
+                    wait = start + per - now
+                else:
+                    wait = (estimate - rate) / previous * per + 0.01
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO windows (namespace, key, window_start, previous, current) VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, start, previous, current)
+                )
+                conn.execute("COMMIT")
+                return wait
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return await self._run(update)
+
+    async def prune(self, max_window: float = 3600):
+        """Drop expired values and windows idle for longer than any limit"""
+        def write():
+            now = time.time()
+            conn = self._connection()
+            conn.execute("DELETE FROM state WHERE expires IS NOT NULL AND expires <= ?", (now,))
+            conn.execute("DELETE FROM windows WHERE window_start < ?", (now - 2 * max_window,))
+        await self._run(write)
+
+    async def close(self):
+        if self._executor is None:
+            return
+        def close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(close)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+def create_backend(settings: Dict[str, Any], clustered: bool = False):
+    """Pick the backend from settings.shared_state; "auto" shares only when clustered"""
+    backend = settings.get('backend', 'auto')
+    if backend == 'auto':
+        backend = 'sqlite' if clustered else 'memory'
+    if backend == 'sqlite':
+        return SQLiteBackend(settings.get('path', 'data/shared_state.db'))
+    return MemoryBackend()
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class SingleFlight:
+    """Coalesce concurrent identical requests into one upstream call.
+
+    The first caller for a key becomes the leader and does the work; any
+    caller arriving while it runs awaits the leader's future instead.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def pending(self, key: str) -> Optional[asyncio.Future]:
+        """The in-flight future for a key, counting the caller as a follower"""
+        future = self._calls.get(key)
+        if future is not None:
+            self.followers += 1
+        return future
+
+    def begin(self, key: str) -> asyncio.Future:
+        """Register the caller as leader for a key"""
+        future = asyncio.get_running_loop().create_future()
+        # Mark errors as retrieved even when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        self.leaders += 1
+        return future
+
+    def resolve(self, key: str, result: Any = None, error: Optional[BaseException] = None,
+                future: Optional[asyncio.Future] = None):
+        """Publish the leader's outcome to every follower
+
+        Pass the future ``begin`` returned so a late resolve can't touch a
+        newer leader's call registered under the same key.
+        """
+        if future is None:
+            future = self._calls.pop(key, None)
+        elif self._calls.get(key) is future:
+            del self._calls[key]
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``func`` once per key no matter how many callers are waiting"""
+        future = self.pending(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = self.begin(key)
+        try:
+            result = await func()
+        except BaseException as e:
+            error = e if isinstance(e, Exception) else RuntimeError("Shared request was cancelled")
+            self.resolve(key, error=error, future=future)
+            raise
+        self.resolve(key, result, future=future)
+        return result
@@ -0,0 +1,69 @@
+import os
+import time
+from typing import Any, Awaitable, List, Optional, Tuple
+
+class StartupTimer:
+    """Phase-by-phase timing of a cold start, from process launch to on_ready.
+
+    Phases are marked in order as startup proceeds. Steps that run
+    concurrently within a phase are timed with ``track`` and listed under
+    the phase they belong to.
+    """
+
+    def __init__(self):
+        now = time.perf_counter()
+        self.launched = now - self.process_age()
+        self.phases: List[Tuple[str, float, List[Tuple[str, float]]]] = []
+        self.total: Optional[float] = None
+        self._last = self.launched
+        self._steps: List[Tuple[str, float]] = []
+        # Interpreter start-up and anything imported before this module
+        self.mark('interpreter')
+
+    @staticmethod
+    def process_age() -> float:
+        """Seconds since the OS started this process (0 where /proc is unavailable)"""
+        try:
+            with open('/proc/self/stat') as f:
+                # Fields after the parenthesised command name; starttime is field 22
+                start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+            with open('/proc/uptime') as f:
+                uptime = float(f.read().split()[0])
+            return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+        except (OSError, ValueError, IndexError, AttributeError):
+            return 0.0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.launched
+
+    def mark(self, phase: str):
+        """Close the current phase under ``phase``"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last, self._steps))
+        self._steps = []
+        self._last = now
+
+    async def track(self, step: str, awaitable: Awaitable[Any]) -> Any:
+        """Await ``awaitable``, recording its duration under the current phase"""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self._steps.append((step, time.perf_counter() - started))
+
+    def finish(self, phase: str = 'gateway') -> bool:
+        """Mark the last phase once; False if startup was already finished"""
+        if self.total is not None:
+            return False
+        self.mark(phase)
+        self.total = self.elapsed()
+        return True
+
+    def report(self) -> str:
+        total = self.total if self.total is not None else self.elapsed()
+        lines = [f"⏱️ Startup took {total:.2f}s from process start"]
+        for phase, seconds, steps in self.phases:
+            lines.append(f"   {phase:<22}{seconds:7.3f}s")
+            for step, step_seconds in steps:
+                lines.append(f"     · {step:<18}{step_seconds:7.3f}s")
+        return "\n".join(lines)
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+class StatsBuffer:
+    """Write-behind aggregation for usage counters.
+
+    Request counts and timestamps are summed in memory and written to the
+    database in one batch per flush, either on a timer or once enough users
+    are pending, instead of one write per AI message.
+    """
+
+    def __init__(self, database, flush_interval: float = 30.0, max_pending: int = 500):
+        self.database = database
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[str, List[Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    def record_request(self, user_id: str):
+        """Count one AI request for a user"""
+        now = datetime.now().isoformat()
+        entry = self._pending.get(user_id)
+        if entry is None:
+            self._pending[user_id] = [1, now, now]
+        else:
+            entry[0] += 1
+            entry[2] = now
+
+        if len(self._pending) >= self.max_pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """Write all pending increments to the database"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                await self.database.apply_request_batch({uid: tuple(v) for uid, v in batch.items()})
+            except Exception as e:
+                # Put the counts back so the next flush retries them
+                for user_id, (count, first, last) in batch.items():
+                    entry = self._pending.setdefault(user_id, [0, first, last])
+                    entry[0] += count
+                    entry[1] = min(entry[1], first)
+                print(f"❌ Stats flush failed: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic task and flush what is left"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Persisted user stats merged with pending increments"""
+        # Wait out a running flush so its batch is counted exactly once
+        async with self._flush_lock:
+            stats = await self.database.get_user_data(user_id)
+        pending = self._pending.get(user_id)
+        if pending:
+            count, first, last = pending
+            stats['total_requests'] = stats.get('total_requests', 0) + count
+            stats.setdefault('first_used', first)
+            stats['last_used'] = last
+        return stats
+
+    async def get_global_stats(self) -> Dict[str, Any]:
+        """Persisted global stats merged with pending increments"""
+        async with self._flush_lock:
+            stats = await self.database.get_global_stats()
+        stats['total_requests'] = stats.get('total_requests', 0) + sum(v[0] for v in self._pending.values())
+        return stats
@@ -0,0 +1,79 @@
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import discord
+
+from utils.helpers import Helpers
+
+class EditThrottle:
+    """Coalesce message edits to at most one per interval per channel"""
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._next_edit: Dict[int, float] = {}
+
+    def ready(self, channel_id: int) -> bool:
+        """Claim the channel's edit slot if it is free"""
+        now = time.monotonic()
+        if now < self._next_edit.get(channel_id, 0.0):
+            return False
+        self._next_edit[channel_id] = now + self.interval
+        if len(self._next_edit) > 1000:
+            # Forget channels whose slot has long expired
+            self._next_edit = {cid: t for cid, t in self._next_edit.items() if t > now}
+        return True
+
+class StreamingReply:
+    """Post the first tokens quickly and edit the message as more arrive"""
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[discord.Message]],
+        channel_id: int,
+        throttle: EditThrottle,
+        prefix: str = "",
+        max_length: int = 2000
+    ):
+        self.send = send
+        self.channel_id = channel_id
+        self.throttle = throttle
+        self.prefix = prefix
+        self.max_length = max_length
+        self.started = time.perf_counter()
+        self.time_to_first_token: Optional[float] = None
+        self.message: Optional[discord.Message] = None
+        self.text = ""
+
+    async def consume(self, tokens: AsyncIterator[str]) -> str:
+        """Drain the token stream into Discord and return the full reply"""
+        full = []
+        body = self.prefix
+        shown = ""
+        async for token in tokens:
+            full.append(token)
+            body += token
+
+            # Roll over to a new message before hitting Discord's limit
+            if len(body) > self.max_length:
+                *done, body = Helpers.split_message(body, self.max_length)
+                for chunk in done:
+                    await self._flush(chunk)
+                    self.message = None
+                shown = ""
+
+            if body.strip() and body != shown:
+                if self.message is None or self.throttle.ready(self.channel_id):
+                    await self._flush(body)
+                    shown = body
+
+        if body.strip() and body != shown:
+            await self._flush(body)
+        self.text = "".join(full)
+        return self.text
+
+    async def _flush(self, body: str):
+        if self.message is None:
+            self.message = await self.send(body)
+            self.throttle.ready(self.channel_id)
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - self.started
+        else:
+            await self.message.edit(content=body)
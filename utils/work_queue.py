@@ -0,0 +1,150 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from utils.metrics import metrics
+
+class FairWorkQueue:
+    """Bounded job queue drained by a fixed pool of workers.
+
+    Jobs are queued per guild and workers take one job from each guild
+    with pending work in turn, so a busy server cannot starve quiet ones.
+    When the queue is full a job is shed: ``drop_oldest`` drops the oldest
+    job of the guild holding the most, ``reject`` refuses the new one.
+    ``on_shed`` is called with every shed job (e.g. to reply "busy").
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        workers: int = 8,
+        max_depth: int = 200,
+        per_guild_depth: int = 25,
+        shed_policy: str = 'drop_oldest',
+        on_shed: Optional[Callable[[Any], None]] = None,
+        name: str = 'ai'
+    ):
+        self.name = name
+        self.handler = handler
+        self.worker_count = workers
+        self.max_depth = max_depth
+        self.per_guild_depth = per_guild_depth
+        self.shed_policy = shed_policy
+        self.on_shed = on_shed
+        self._queues: Dict[Hashable, Deque[Tuple[float, Any]]] = {}
+        self._ready: Deque[Hashable] = deque()
+        self._available = asyncio.Semaphore(0)
+        self._workers: List[asyncio.Task] = []
+        self.depth = 0
+        self.active = 0
+        self.processed = 0
+        self.shed = 0
+        self.errors = 0
+        self.wait_times = deque(maxlen=1000)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self.wait_times)
+        return {
+            'depth': self.depth,
+            'guilds_waiting': len(self._ready),
+            'processed': self.processed,
+            'shed': self.shed,
+            'errors': self.errors,
+            'avg_wait': sum(waits) / len(waits) if waits else 0.0,
+            'p95_wait': waits[int(len(waits) * 0.95)] if waits else 0.0
+        }
+
+    def start(self):
+        """Spawn the worker pool"""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def drain(self, timeout: float = 10.0) -> bool:
+        """Wait until queued and running jobs finish; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while (self.depth or self.active) and self._workers:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return not (self.depth or self.active)
+
+    async def stop(self):
+        """Cancel the workers, dropping anything still queued"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, guild_id: Hashable, job: Any) -> bool:
+        """Queue a job, returns False if the job itself was shed"""
+        if len(self._queues.get(guild_id, ())) >= self.per_guild_depth:
+            if self.shed_policy == 'reject':
+                self._shed(job)
+                return False
+            self._drop_oldest(guild_id)
+        elif self.depth >= self.max_depth:
+            if self.shed_policy == 'reject':
+                self._shed(job)
+                return False
+            self._drop_oldest(max(self._queues, key=lambda g: len(self._queues[g])))
+
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = deque()
+            self._ready.append(guild_id)
+        queue.append((time.monotonic(), job))
+        self.depth += 1
+        self._available.release()
+        return True
+
+    def _drop_oldest(self, guild_id: Hashable):
+        queue = self._queues[guild_id]
+        _, job = queue.popleft()
+        self.depth -= 1
+        if not queue:
+            del self._queues[guild_id]
+            self._ready.remove(guild_id)
+        self._shed(job)
+
+    def _shed(self, job: Any):
+        self.shed += 1
+        metrics.inc('bot_queue_shed_total', queue=self.name)
+        if self.on_shed:
+            self.on_shed(job)
+
+    def _next_job(self) -> Optional[Tuple[float, Any]]:
+        """Round-robin across guilds with pending work"""
+        if not self._ready:
+            return None
+        guild_id = self._ready.popleft()
+        queue = self._queues[guild_id]
+        item = queue.popleft()
+        if queue:
+            self._ready.append(guild_id)
+        else:
+            del self._queues[guild_id]
+        self.depth -= 1
+        return item
+
+    async def _worker(self):
+        while True:
+            await self._available.acquire()
+            # Shed jobs leave stale permits behind
+            item = self._next_job()
+            if item is None:
+                continue
+            enqueued, job = item
+            waited = time.monotonic() - enqueued
+            self.wait_times.append(waited)
+            metrics.observe('bot_queue_wait_seconds', waited, queue=self.name)
+            self.active += 1
+            try:
+                await self.handler(job)
+            except Exception as e:
+                self.errors += 1
+                metrics.inc('bot_errors_total', where=f'{self.name}_queue', type=type(e).__name__)
+                print(f"❌ Queued job failed: {e}")
+            finally:
+                self.active -= 1
+                self.processed += 1